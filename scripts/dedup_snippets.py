@@ -0,0 +1,227 @@
+# dedup_snippets.py
+
+"""Find duplicate and near-duplicate snippets before they are imported.
+
+`Challenge.content` is unique in the database, so two PATTERN blocks that
+format to the same text (see `getFormattedText` in parser.service.ts) make
+the import fail midway. This builds, over every block the importer would
+accept, an exact index keyed by the sha256 of the formatted text and a
+MinHash/LSH index of token shingles. Each snippet is only compared with
+the snippets sharing an LSH bucket with it, instead of the whole corpus.
+
+Snippets are named like the importer's `Challenge.path`:
+<relative path>#snippet-<n>.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from validate_snippets import (
+    DEFAULT_CONFIG_PATH,
+    PATTERN_FILE_RE,
+    check_block,
+    get_formatted_text,
+    load_filters,
+    scan_snippets,
+    split_pattern_blocks,
+)
+
+NUM_PERM = 128
+BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 similarity share a bucket
+SHINGLE_SIZE = 5  # Tokens per shingle
+SEED = 1
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+_permutations: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+# (snippet path, formatted text, exact hash, MinHash signature)
+Snippet = Tuple[str, str, str, np.ndarray]
+
+
+def permutations() -> Tuple[np.ndarray, np.ndarray]:
+    """The (a, b) of the NUM_PERM hash functions, the same in every process."""
+    global _permutations
+    if _permutations is None:
+        rng = np.random.RandomState(SEED)
+        _permutations = (
+            rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64),
+            rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64),
+        )
+    return _permutations
+
+
+def minhash(text: str) -> np.ndarray:
+    """MinHash signature of the token shingles of `text`."""
+    tokens = TOKEN_RE.findall(text)
+    shingles = {
+        " ".join(tokens[i:i + SHINGLE_SIZE])
+        for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))
+    }
+    hashes = np.array(
+        [
+            int.from_bytes(hashlib.sha1(s.encode("utf-8")).digest()[:4], "little")
+            for s in shingles
+        ],
+        dtype=np.uint64,
+    )
+    a, b = permutations()
+    # Wrapping uint64 arithmetic, as in the usual universal-hash MinHash
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, a) + b) % MERSENNE_PRIME & MAX_HASH
+    return permuted.min(axis=0)
+
+
+def index_file(job: Tuple[Path, Path, Dict[str, int], bool]) -> List[Snippet]:
+    """The snippets the importer would take from one PATTERN file."""
+    path, root, filters, all_blocks = job
+    content = path.read_text(encoding="utf-8", errors="replace")
+    if not PATTERN_FILE_RE.search(content.replace("\r\n", "\n").replace("\r", "\n")):
+        return []
+    relative_path = path.relative_to(root).as_posix()
+    snippets = []
+    for _, _, text in split_pattern_blocks(content):
+        if not all_blocks and check_block(text, filters):
+            continue
+        formatted = get_formatted_text(text)
+        digest = hashlib.sha256(formatted.encode("utf-8")).hexdigest()
+        name = f"{relative_path}#snippet-{len(snippets) + 1}"
+        snippets.append((name, formatted, digest, minhash(formatted)))
+    return snippets
+
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        self.parent[self.find(i)] = self.find(j)
+
+
+def near_duplicate_groups(
+    signatures: List[np.ndarray], threshold: float
+) -> List[List[int]]:
+    """Groups of signatures whose estimated Jaccard similarity is at least
+    `threshold`, comparing only the ones that share an LSH bucket."""
+    rows = NUM_PERM // BANDS
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    groups = UnionFind(len(signatures))
+    for i, signature in enumerate(signatures):
+        for band in range(BANDS):
+            key = (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for j in buckets.setdefault(key, []):
+                if groups.find(i) != groups.find(j) and (
+                    np.mean(signature == signatures[j]) >= threshold
+                ):
+                    groups.union(i, j)
+            buckets[key].append(i)
+    clusters: Dict[int, List[int]] = {}
+    for i in range(len(signatures)):
+        clusters.setdefault(groups.find(i), []).append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def main():
+    """Main function to report duplicate snippets."""
+    parser = argparse.ArgumentParser(
+        description="Report exact and near-duplicate snippets across a snippets tree."
+    )
+    parser.add_argument(
+        "snippets_dir",
+        type=Path,
+        help="The snippets root to index (e.g., 'speedtyper-solo/snippets/').",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CONFIG_PATH,
+        help="parser.config.json whose filters decide which blocks are imported.",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.8,
+        help="Estimated Jaccard similarity of token shingles for near duplicates (default 0.8).",
+    )
+    parser.add_argument(
+        "--all-blocks",
+        action="store_true",
+        help="Also index blocks the importer's filters would reject.",
+    )
+    parser.add_argument("--json", type=Path, help="Also write the report to this JSON file.")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Indexer processes (default: one per CPU)."
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    filters = load_filters(args.config)
+    files = scan_snippets(args.snippets_dir)
+    snippets: List[Snippet] = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        jobs = ((path, args.snippets_dir, filters, args.all_blocks) for path in files)
+        for file_snippets in pool.map(index_file, jobs, chunksize=16):
+            snippets.extend(file_snippets)
+
+    exact: Dict[str, List[int]] = {}
+    for i, (_, _, digest, _) in enumerate(snippets):
+        exact.setdefault(digest, []).append(i)
+    exact_groups = [members for members in exact.values() if len(members) > 1]
+
+    # Near duplicates among distinct texts: one representative per exact group
+    representatives = [members[0] for members in exact.values()]
+    near_groups = [
+        [representatives[i] for i in group]
+        for group in near_duplicate_groups(
+            [snippets[i][3] for i in representatives], args.threshold
+        )
+    ]
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"Indexed {len(snippets)} snippet(s) from {len(files)} file(s) in {elapsed_ms:.0f} ms\n")
+    print(f"Exact duplicates (same text after formatting): {len(exact_groups)} group(s)")
+    for members in exact_groups:
+        print(f"  = {snippets[members[0]][2][:12]}")
+        for i in members:
+            print(f"      {snippets[i][0]}")
+    print(f"\nNear duplicates (similarity >= {args.threshold}): {len(near_groups)} group(s)")
+    for members in near_groups:
+        print("  ~")
+        for i in members:
+            copies = len(exact[snippets[i][2]])
+            suffix = f" (+{copies - 1} exact copies)" if copies > 1 else ""
+            print(f"      {snippets[i][0]}{suffix}")
+
+    redundant = sum(len(m) - 1 for m in exact_groups) + sum(len(m) - 1 for m in near_groups)
+    print(f"\n{redundant} snippet(s) could be dropped before import.")
+
+    if args.json:
+        report = {
+            "exact": [[snippets[i][0] for i in members] for members in exact_groups],
+            "near": [
+                [snippets[j][0] for i in members for j in exact[snippets[i][2]]]
+                for members in near_groups
+            ],
+        }
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to '{args.json}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,489 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
+import io
+import json
+import os
+import re
 import shutil
+import stat
+import subprocess
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+COPIED = 'copied'
+UNCHANGED = 'unchanged'
+MISSING = 'missing'
+DIRECTORY = 'directory'
+
+CHUNK_SIZE = 1024 * 1024
+
+# Output suffixes that select archive mode, longest first
+ARCHIVE_FORMATS = {
+    '.tar.zst': 'tar.zst',
+    '.tar.gz': 'tar.gz',
+    '.tzst': 'tar.zst',
+    '.tgz': 'tar.gz',
+    '.tar': 'tar',
+    '.zip': 'zip',
+}
+# Member listing every archived file as {path: {sha256, size, mtime_ns}},
+# the entry format of populate_snippets.py's manifest
+MANIFEST_NAME = '.export-manifest.json'
+
+
+def compile_glob(pattern):
+    """Regex for a glob over '/'-separated relative paths: `*` and `?` stay
+    within one directory, `**` spans any number of them. A pattern without
+    a '/' matches the file name at any depth, like .gitignore."""
+    if '/' not in pattern.rstrip('/'):
+        pattern = '**/' + pattern
+    parts = re.split(r'(\*\*/?|\*|\?|\[[^\]]*\])', pattern.lstrip('/'))
+    regex = ''
+    for part in parts:
+        if part in ('**/', '**'):
+            regex += '(?:.*/)?' if part == '**/' else '.*'
+        elif part == '*':
+            regex += '[^/]*'
+        elif part == '?':
+            regex += '[^/]'
+        elif part.startswith('[') and part.endswith(']') and len(part) > 2:
+            regex += '[' + part[1:-1].replace('!', '^', 1) + ']' if part[1] == '!' else part
+        else:
+            regex += re.escape(part)
+    # A pattern naming a directory selects everything under it
+    return re.compile(regex + '(?:/.*)?$')
+
+
+def walk_files(root, start='', excludes=()):
+    """Relative paths of all files under `root`/`start`, in one scandir walk.
+    .git and directories matching an exclude pattern are not entered."""
+    stack = [start]
+    files = []
+    while stack:
+        rel_dir = stack.pop()
+        with os.scandir(os.path.join(root, rel_dir)) as entries:
+            for entry in entries:
+                rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != '.git' and not any(r.match(rel_path) for r in excludes):
+                        stack.append(rel_path)
+                elif entry.is_file():
+                    files.append(rel_path)
+    return sorted(files)
+
+
+def git_lines(repo_path, command, *args):
+    result = subprocess.run(
+        ['git', '-C', str(repo_path), command, '-z', *args],
+        check=True, capture_output=True, text=True,
+    )
+    return [line for line in result.stdout.split('\0') if line]
+
+
+def git_files(repo_path):
+    """Tracked plus untracked, not ignored files, as git sees them."""
+    return sorted(git_lines(repo_path, 'ls-files', '--cached', '--others', '--exclude-standard'))
+
+
+def git_changed_files(repo_path, revision):
+    """Files added or modified since `revision`, including uncommitted and
+    untracked changes; deleted files are left out. Like the other git
+    listings, paths are relative to `repo_path` and limited to it, which
+    may be a subdirectory of the repository."""
+    changed = set(git_lines(
+        repo_path, 'diff', '--relative', '--name-only', '--diff-filter=d', revision, '--', '.',
+    ))
+    changed.update(git_lines(repo_path, 'ls-files', '--others', '--exclude-standard'))
+    return sorted(changed)
+
+
+def select_files(repo_path, listed, includes, excludes, use_git, changed_since):
+    """The relative paths to export: the listed paths (directories expanded),
+    or the changed files, or the whole repo, filtered by the glob patterns."""
+    include_res = [compile_glob(pattern) for pattern in includes]
+    exclude_res = [compile_glob(pattern) for pattern in excludes]
+    if changed_since:
+        candidates = git_changed_files(repo_path, changed_since)
+    elif listed is None:
+        candidates = git_files(repo_path) if use_git else walk_files(repo_path, '', exclude_res)
+    else:
+        all_files = git_files(repo_path) if use_git else None
+        candidates = []
+        for rel_path in listed:
+            rel_path = rel_path.strip('/')
+            if not (repo_path / rel_path).is_dir():
+                candidates.append(rel_path)
+            elif all_files is not None:
+                candidates.extend(f for f in all_files if f.startswith(rel_path + '/'))
+            else:
+                candidates.extend(walk_files(repo_path, rel_path, exclude_res))
+    return [
+        rel_path
+        for rel_path in dict.fromkeys(candidates)
+        if (not include_res or any(r.match(rel_path) for r in include_res))
+        and not any(r.match(rel_path) for r in exclude_res)
+    ]
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def is_up_to_date(source_stat, source, dest, checksum):
+    """True if `dest` already matches `source` by size and mtime, or, with
+    `checksum`, by size and content hash."""
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    if dest_stat.st_size != source_stat.st_size:
+        return False
+    if dest_stat.st_mtime_ns == source_stat.st_mtime_ns:
+        return True
+    return checksum and file_hash(source) == file_hash(dest)
+
+
+def fast_copy(source, dest, size):
+    """Copy file data in the kernel with copy_file_range where available,
+    falling back to shutil (which uses sendfile on Linux), then copy the
+    metadata like shutil.copy2."""
+    copied = False
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(source, 'rb') as fsrc, open(dest, 'wb') as fdst:
+                remaining = size
+                while remaining > 0:
+                    sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+                copied = remaining == 0
+        except OSError:
+            copied = False
+    if not copied:
+        shutil.copyfile(source, dest)
+    shutil.copystat(source, dest)
+
+
+class DirectoryCache:
+    """Creates each destination directory once, however many files it gets."""
+
+    def __init__(self):
+        self._created = set()
+        self._lock = threading.Lock()
+
+    def ensure(self, directory):
+        with self._lock:
+            # Created under the lock, so no thread writes into a directory
+            # another one has only just claimed
+            if directory not in self._created:
+                directory.mkdir(parents=True, exist_ok=True)
+                self._created.add(directory)
+
+
+def export_file(source, dest, checksum, directories):
+    try:
+        source_stat = os.stat(source)
+    except FileNotFoundError:
+        return MISSING
+    if stat.S_ISDIR(source_stat.st_mode):
+        return DIRECTORY
+    directories.ensure(dest.parent)
+    if is_up_to_date(source_stat, source, dest, checksum):
+        if checksum:
+            # Matched by content: align the mtime so the next run skips it cheaply
+            shutil.copystat(source, dest)
+        return UNCHANGED
+    fast_copy(source, dest, source_stat.st_size)
+    return COPIED
+
+
+def archive_format(path):
+    name = path.name.lower()
+    return next((fmt for suffix, fmt in ARCHIVE_FORMATS.items() if name.endswith(suffix)), None)
+
+
+class TarArchive:
+    """Sequential tar writer; `compression` is '', 'gz' or 'zst'."""
+
+    def __init__(self, fileobj, compression):
+        self._zstd_writer = None
+        if compression == 'zst':
+            try:
+                import zstandard
+            except ImportError:
+                raise SystemExit('Error: .tar.zst output needs the zstandard package '
+                                 '(pip install zstandard)')
+            self._zstd_writer = zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False)
+            fileobj, compression = self._zstd_writer, ''
+        self.tar = tarfile.open(fileobj=fileobj, mode=f'w|{compression}')
+
+    def add(self, rel_path, size, mtime, mode, data=None, source=None):
+        """Add `data`, or the file `source` streamed from disk."""
+        info = tarfile.TarInfo(rel_path)
+        info.size = size
+        info.mtime = mtime
+        info.mode = stat.S_IMODE(mode)
+        if data is not None:
+            self.tar.addfile(info, io.BytesIO(data))
+        else:
+            with open(source, 'rb') as f:
+                self.tar.addfile(info, f)
+
+    def close(self):
+        self.tar.close()
+        if self._zstd_writer is not None:
+            self._zstd_writer.close()
+
+
+class ZipArchive:
+    """Sequential deflate zip writer."""
+
+    def __init__(self, fileobj):
+        self.zip = zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED)
+
+    def add(self, rel_path, size, mtime, mode, data=None, source=None):
+        """Add `data`, or the file `source` streamed from disk."""
+        # Zip cannot store dates before 1980
+        date_time = max(time.localtime(mtime)[:6], (1980, 1, 1, 0, 0, 0))
+        info = zipfile.ZipInfo(rel_path, date_time=date_time)
+        info.external_attr = (mode & 0xFFFF) << 16
+        info.compress_type = zipfile.ZIP_DEFLATED
+        if data is not None:
+            self.zip.writestr(info, data)
+        else:
+            with open(source, 'rb') as src, self.zip.open(info, 'w', force_zip64=True) as dst:
+                shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+    def close(self):
+        self.zip.close()
+
+
+def open_archive(fileobj, fmt):
+    if fmt == 'zip':
+        return ZipArchive(fileobj)
+    return TarArchive(fileobj, fmt.partition('.')[2])
+
+
+def export_archive(repo_path, file_paths, archive_path, fmt, jobs, read_ahead, manifest,
+                   progress, verbose):
+    """Stream the files into one archive, written sequentially in list order.
+
+    Files are read on a thread pool ahead of the writer, holding at most
+    `read_ahead` bytes in memory; a larger file is streamed from disk on its
+    own. The archive is written to a temporary name and moved into place.
+    """
+    results = {COPIED: 0, UNCHANGED: 0, MISSING: 0, DIRECTORY: 0}
+    warnings = []
+    entries = {}
+    pending = deque()  # (rel_path, stat, future) in list order
+    buffered = 0
+
+    def read(source):
+        with open(source, 'rb') as f:
+            return f.read()
+
+    def write(archive, rel_path, source_stat, data=None):
+        source = repo_path / rel_path
+        archive.add(rel_path, source_stat.st_size, source_stat.st_mtime, source_stat.st_mode,
+                    data=data, source=source)
+        if manifest:
+            digest = hashlib.sha256(data).digest() if data is not None else file_hash(source)
+            entries[rel_path] = {
+                'sha256': digest.hex(),
+                'size': source_stat.st_size,
+                'mtime_ns': source_stat.st_mtime_ns,
+            }
+        results[COPIED] += 1
+        progress.advance()
+        if verbose:
+            print(f"✓ Archived: {rel_path}")
+
+    def write_oldest(archive):
+        nonlocal buffered
+        rel_path, source_stat, future = pending.popleft()
+        buffered -= source_stat.st_size
+        write(archive, rel_path, source_stat, future.result())
+
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(archive_path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as raw, ThreadPoolExecutor(max_workers=jobs) as pool:
+            archive = open_archive(raw, fmt)
+            for rel_path in file_paths:
+                try:
+                    source_stat = os.stat(repo_path / rel_path)
+                except FileNotFoundError:
+                    results[MISSING] += 1
+                    warnings.append(f"⚠️  Skipped (not found): {rel_path}")
+                    progress.advance()
+                    continue
+                if stat.S_ISDIR(source_stat.st_mode):
+                    results[DIRECTORY] += 1
+                    warnings.append(f"⚠️  Skipped (is directory): {rel_path}")
+                    progress.advance()
+                    continue
+                if source_stat.st_size > read_ahead:
+                    while pending:
+                        write_oldest(archive)
+                    write(archive, rel_path, source_stat)
+                    continue
+                while pending and buffered + source_stat.st_size > read_ahead:
+                    write_oldest(archive)
+                pending.append((rel_path, source_stat, pool.submit(read, repo_path / rel_path)))
+                buffered += source_stat.st_size
+            while pending:
+                write_oldest(archive)
+            if manifest:
+                data = json.dumps(entries, indent=2, sort_keys=True).encode('utf-8')
+                archive.add(MANIFEST_NAME, len(data), time.time(), 0o100644, data=data)
+            archive.close()
+        os.replace(tmp_path, archive_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return results, warnings
+
+
+class Progress:
+    """A single self-updating counter line instead of a line per file."""
+
+    def __init__(self, total, enabled):
+        self.total = total
+        self.done = 0
+        self.enabled = enabled
+        self._lock = threading.Lock()
+
+    def advance(self):
+        with self._lock:
+            self.done += 1
+            if self.enabled and (self.done % 100 == 0 or self.done == self.total):
+                print(f'\r⏳ {self.done}/{self.total} files', end='', flush=True)
+
+    def finish(self):
+        if self.enabled and self.total:
+            print()
+
+
 def main():
     parser = argparse.ArgumentParser(description='Copy files from repo to export directory')
     parser.add_argument('repo_path', help='Path to the speedtyper.dev repository')
-    parser.add_argument('output_dir', help='Directory to export files to')
-    parser.add_argument('--input-files', required=True, help='Path to file containing list of files to export')
-    
+    parser.add_argument('output_dir',
+                        help='Directory to export files to, or an archive to stream them into '
+                             '(.tar, .tar.gz, .tar.zst or .zip)')
+    parser.add_argument('--input-files',
+                        help='Path to file containing list of files (or directories) to export')
+    parser.add_argument('--include', action='append', default=[],
+                        help="Only export paths matching this glob (e.g. 'src/**/*.ts'); repeatable")
+    parser.add_argument('--exclude', action='append', default=[],
+                        help="Never export paths matching this glob (e.g. 'node_modules'); repeatable")
+    parser.add_argument('--git', action='store_true',
+                        help='Select from git ls-files, so .gitignore is respected')
+    parser.add_argument('--changed-since', metavar='REV',
+                        help='Only export files added or modified since this git revision')
+    parser.add_argument('--jobs', type=int, default=min(32, (os.cpu_count() or 1) * 4),
+                        help='Number of files copied in parallel')
+    parser.add_argument('--checksum', action='store_true',
+                        help='Also skip files whose content matches even if their mtime differs')
+    parser.add_argument('--read-ahead', type=int, default=64, metavar='MB',
+                        help='Archive mode: memory for files read ahead of the writer')
+    parser.add_argument('--manifest', action='store_true',
+                        help=f'Archive mode: add {MANIFEST_NAME} with the size, mtime and '
+                             'sha256 of every file')
+    parser.add_argument('--verbose', action='store_true', help='Print a line per copied file')
+
     args = parser.parse_args()
-    
+
     repo_path = Path(args.repo_path).resolve()
     output_dir = Path(args.output_dir).resolve()
-    input_files = Path(args.input_files).resolve()
-    
+
     # Validate repo exists
     if not repo_path.exists():
         print(f"Error: Repository path does not exist: {repo_path}")
         return 1
-    
+
+    if not (args.input_files or args.include or args.git or args.changed_since):
+        parser.error('give --input-files, --include, --git or --changed-since')
+
     # Validate input file exists
-    if not input_files.exists():
-        print(f"Error: Input files list does not exist: {input_files}")
+    listed = None
+    if args.input_files:
+        input_files = Path(args.input_files).resolve()
+        if not input_files.exists():
+            print(f"Error: Input files list does not exist: {input_files}")
+            return 1
+        with open(input_files, 'r') as f:
+            listed = [line.strip() for line in f if line.strip()]
+
+    try:
+        file_paths = select_files(
+            repo_path, listed, args.include, args.exclude, args.git, args.changed_since
+        )
+    except subprocess.CalledProcessError as e:
+        print(f"Error: git failed in {repo_path}: {e.stderr.strip()}")
         return 1
-    
+
+    progress = Progress(len(file_paths), enabled=not args.verbose and sys.stdout.isatty())
+
+    fmt = archive_format(output_dir)
+    if fmt is not None:
+        results, warnings = export_archive(
+            repo_path, file_paths, output_dir, fmt, args.jobs, args.read_ahead * 1024 * 1024,
+            args.manifest, progress, args.verbose,
+        )
+        progress.finish()
+        for warning in warnings:
+            print(warning)
+        print(f"\n{'='*50}")
+        print(f"✓ Archived: {results[COPIED]} files")
+        print(f"⚠️  Skipped: {results[MISSING] + results[DIRECTORY]} files")
+        print(f"📦 Archive: {output_dir} ({output_dir.stat().st_size / 1e6:.1f} MB)")
+        return 0
+
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Read file list
-    with open(input_files, 'r') as f:
-        file_paths = [line.strip() for line in f if line.strip()]
-    
-    copied = 0
-    skipped = 0
-    
-    for rel_path in file_paths:
-        source = repo_path / rel_path
-        dest = output_dir / rel_path
-        
-        if not source.exists():
-            print(f"⚠️  Skipped (not found): {rel_path}")
-            skipped += 1
-            continue
-        
-        if source.is_dir():
-            print(f"⚠️  Skipped (is directory): {rel_path}")
-            skipped += 1
-            continue
-        
-        # Create parent directories in destination
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Copy file
-        shutil.copy2(source, dest)
-        print(f"✓ Copied: {rel_path}")
-        copied += 1
-    
+
+    results = {COPIED: 0, UNCHANGED: 0, MISSING: 0, DIRECTORY: 0}
+    warnings = []
+    directories = DirectoryCache()
+
+    def export(rel_path):
+        outcome = export_file(
+            repo_path / rel_path, output_dir / rel_path, args.checksum, directories
+        )
+        progress.advance()
+        return rel_path, outcome
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        for rel_path, outcome in pool.map(export, file_paths):
+            results[outcome] += 1
+            if outcome == MISSING:
+                warnings.append(f"⚠️  Skipped (not found): {rel_path}")
+            elif outcome == DIRECTORY:
+                warnings.append(f"⚠️  Skipped (is directory): {rel_path}")
+            elif outcome == COPIED and args.verbose:
+                print(f"✓ Copied: {rel_path}")
+    progress.finish()
+    for warning in warnings:
+        print(warning)
+
     print(f"\n{'='*50}")
-    print(f"✓ Copied: {copied} files")
-    print(f"⚠️  Skipped: {skipped} files")
+    print(f"✓ Copied: {results[COPIED]} files")
+    print(f"= Unchanged: {results[UNCHANGED]} files")
+    print(f"⚠️  Skipped: {results[MISSING] + results[DIRECTORY]} files")
     print(f"📁 Output directory: {output_dir}")
-    
+
     return 0
 
 if __name__ == '__main__':
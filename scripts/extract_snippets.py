@@ -0,0 +1,308 @@
+# extract_snippets.py
+
+"""Turn LLM results into importable snippet files.
+
+Reads the RESULTS.parquet (or RESULTS.pkl) of a snippets/python template run
+and writes every fenced code block of each RESULT, under a `// PATTERN:` or
+`# PATTERN:` marker, to
+
+    <snippets>/<lang>/gm_XX_YYY_ZZ_<title>.<ext>
+
+where XX is the extraction pass, YYY the topic (one per language and title,
+reused across passes) and ZZ the result within the topic. Blocks whose
+content is already in the snippets tree, or seen earlier in the same pass,
+are dropped. Results are parsed in a process pool, so thousands of them
+become snippets in one pass.
+"""
+
+import argparse
+import hashlib
+import re
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, TypedDict
+
+import pandas as pd
+
+# Fence info string -> (snippets directory, file extension). Only extensions
+# picked up by `import-local-snippets` are produced.
+LANGUAGES: Dict[str, Tuple[str, str]] = {
+    "python": ("python", "py"),
+    "python3": ("python", "py"),
+    "py": ("python", "py"),
+    "javascript": ("javascript", "js"),
+    "js": ("javascript", "js"),
+    "jsx": ("javascript", "jsx"),
+    "typescript": ("typescript", "ts"),
+    "ts": ("typescript", "ts"),
+    "tsx": ("typescript", "tsx"),
+    "java": ("java", "java"),
+    "go": ("go", "go"),
+    "golang": ("go", "go"),
+    "rust": ("rust", "rs"),
+    "rs": ("rust", "rs"),
+    "c": ("c", "c"),
+    "cpp": ("cpp", "cpp"),
+    "c++": ("cpp", "cpp"),
+    "csharp": ("csharp", "cs"),
+    "cs": ("csharp", "cs"),
+    "c#": ("csharp", "cs"),
+}
+
+FENCE_RE = re.compile(r"^[ \t]*```[ \t]*([^\s`]*)[^\n]*\n(.*?)^[ \t]*```[ \t]*$", re.M | re.S)
+# Same marker as Parser.extractPatternBlocks in parser.service.ts
+PATTERN_RE = re.compile(r"^(?:\/\/|#)\s*PATTERN:\s*(.+)$")
+SNIPPET_NAME_RE = re.compile(r"^gm_(\d+)_(\d+)_(\d+)_(.+)\.\w+$")
+
+
+class Extracted(TypedDict):
+    """The code blocks of one result, in the language of its snippet file."""
+    prompt_id: object
+    directory: str
+    extension: str
+    title: str
+    blocks: List[str]
+
+
+def slugify(title: str) -> str:
+    """File name part of a title: "React Router (v6)" -> "react-router-v6"."""
+    return re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")[:60] or "snippet"
+
+
+def clean_block(code: str) -> str:
+    """Dedent a code block, drop stray PATTERN markers and trailing spaces."""
+    lines = [line.rstrip() for line in code.splitlines() if not PATTERN_RE.match(line.strip())]
+    return textwrap.dedent("\n".join(lines)).strip("\n")
+
+
+def block_hash(code: str) -> str:
+    """Content hash of a block, insensitive to line endings and trailing spaces."""
+    normalized = "\n".join(line.rstrip() for line in code.strip().splitlines())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def extract_blocks(row: Tuple[object, object, object, object]) -> Optional[Extracted]:
+    """Pull the code blocks of one (PROMPT_ID, RESULT, LANG, title) row.
+
+    Blocks fenced as another language (e.g. a shell install line) are
+    skipped; untagged blocks are taken to be in the row's language.
+    """
+    prompt_id, result, lang, title = row
+    if not isinstance(result, str):
+        return None
+    fences = [(tag.lower(), code) for tag, code in FENCE_RE.findall(result)]
+    language = LANGUAGES.get(str(lang).strip().lower()) if isinstance(lang, str) else None
+    if language is None:
+        language = next((LANGUAGES[tag] for tag, _ in fences if tag in LANGUAGES), None)
+    if language is None:
+        return None
+
+    directory, extension = language
+    tagged_extension = None
+    blocks = []
+    for tag, code in fences:
+        if tag:
+            if LANGUAGES.get(tag, (None,))[0] != directory:
+                continue
+            tagged_extension = tagged_extension or LANGUAGES[tag][1]
+        code = clean_block(code)
+        if code:
+            blocks.append(code)
+    if not blocks:
+        return None
+    return {
+        "prompt_id": prompt_id,
+        "directory": directory,
+        "extension": tagged_extension or extension,
+        "title": " ".join(title.split()) if isinstance(title, str) and title.strip() else directory,
+        "blocks": blocks,
+    }
+
+
+def format_snippet(title: str, extension: str, blocks: List[str]) -> str:
+    """The text of a snippet file: each block under its PATTERN marker."""
+    comment = "#" if extension == "py" else "//"
+    return "\n\n".join(f"{comment} PATTERN: {title}\n\n{block}" for block in blocks)
+
+
+def scan_snippets(root: Path) -> Tuple[int, Dict[Tuple[str, str], int], Set[str]]:
+    """Return the last pass number, the topic numbers by (directory, slug)
+    and the hashes of all PATTERN blocks already under `root`."""
+    last_pass = 0
+    topics: Dict[Tuple[str, str], int] = {}
+    hashes: Set[str] = set()
+    for path in root.rglob("*"):
+        if not path.is_file():
+            continue
+        match = SNIPPET_NAME_RE.match(path.name)
+        if match:
+            last_pass = max(last_pass, int(match.group(1)))
+            topics.setdefault((path.parent.name, match.group(4)), int(match.group(2)))
+        if path.suffix.lstrip(".") not in {ext for _, ext in LANGUAGES.values()}:
+            continue
+        block: List[str] = []
+        in_block = False
+        for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+            if PATTERN_RE.match(line):
+                if block:
+                    hashes.add(block_hash("\n".join(block)))
+                block, in_block = [], True
+            elif in_block:
+                block.append(line)
+        if block:
+            hashes.add(block_hash("\n".join(block)))
+    return last_pass, topics, hashes
+
+
+class SnippetNamer:
+    """Names the snippet files of one extraction pass, gm_XX_YYY_ZZ_<slug>.<ext>,
+    and drops blocks already under the snippets root or seen earlier in the pass."""
+
+    def __init__(self, root: Path, pass_number: Optional[int] = None):
+        last_pass, self.topics, self.seen = scan_snippets(root)
+        self.pass_number = pass_number or last_pass + 1
+        self.next_topic = max(self.topics.values(), default=0) + 1
+        self.variants: Dict[Tuple[str, str], int] = {}
+        self.duplicates = 0
+
+    def new_blocks(self, blocks: List[str]) -> List[str]:
+        """The blocks whose content is not in the snippets tree yet."""
+        fresh = []
+        for block in blocks:
+            digest = block_hash(block)
+            if digest in self.seen:
+                self.duplicates += 1
+                continue
+            self.seen.add(digest)
+            fresh.append(block)
+        return fresh
+
+    def file_name(self, extracted: Extracted) -> str:
+        """Name of the next file of `extracted`'s topic in this pass."""
+        slug = slugify(extracted["title"])
+        topic_key = (extracted["directory"], slug)
+        if topic_key not in self.topics:
+            self.topics[topic_key] = self.next_topic
+            self.next_topic += 1
+        self.variants[topic_key] = self.variants.get(topic_key, 0) + 1
+        return (
+            f"gm_{self.pass_number:02d}_{self.topics[topic_key]:03d}"
+            f"_{self.variants[topic_key]:02d}_{slug}.{extracted['extension']}"
+        )
+
+
+def read_results(path: Path, columns: List[str]) -> pd.DataFrame:
+    """Read only `columns` (those that exist) of a results file."""
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        available = pq.read_schema(path).names
+        return pd.read_parquet(path, columns=[col for col in columns if col in available])
+    df = pd.read_pickle(path)
+    return df[[col for col in columns if col in df.columns]]
+
+
+def main():
+    """Main function to extract snippet files from results."""
+    parser = argparse.ArgumentParser(
+        description="Extract fenced code blocks from LLM results into snippet files."
+    )
+    parser.add_argument(
+        "results", type=Path, help="RESULTS.parquet or RESULTS.pkl of a template run."
+    )
+    parser.add_argument(
+        "output_dir",
+        type=Path,
+        help="The snippets root to write into (e.g., 'speedtyper-solo/snippets/').",
+    )
+    parser.add_argument("--result-column", default="RESULT")
+    parser.add_argument("--lang-column", default="LANG")
+    parser.add_argument(
+        "--title-column",
+        default="title",
+        help="Column naming each snippet (default: title, falling back to category).",
+    )
+    parser.add_argument("--category-column", default="category")
+    parser.add_argument(
+        "--pass-number",
+        type=int,
+        help="XX of gm_XX_YYY_ZZ (default: one after the highest in the output directory).",
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace snippet files that already exist (e.g. when re-running a --pass-number).",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Parser processes (default: one per CPU)."
+    )
+    args = parser.parse_args()
+    root_path: Path = args.output_dir
+
+    columns = [
+        "PROMPT_ID",
+        args.result_column,
+        args.lang_column,
+        args.title_column,
+        args.category_column,
+    ]
+    df = read_results(args.results, columns)
+    if args.result_column not in df.columns:
+        print(f"Error: column '{args.result_column}' not found in {args.results}")
+        return 1
+    if "PROMPT_ID" in df.columns:
+        df = df.sort_values("PROMPT_ID", kind="stable")
+    titles = df.get(args.title_column, pd.Series(None, index=df.index, dtype=object))
+    if args.category_column in df.columns:
+        titles = titles.where(titles.notna(), df[args.category_column])
+    rows = zip(
+        df["PROMPT_ID"] if "PROMPT_ID" in df.columns else df.index,
+        df[args.result_column],
+        df.get(args.lang_column, pd.Series(None, index=df.index, dtype=object)),
+        titles,
+    )
+
+    namer = SnippetNamer(root_path, args.pass_number)
+    created = unusable = existing = 0
+
+    print(
+        f"Extracting snippets from '{args.results}' into '{root_path.resolve()}' "
+        f"(pass {namer.pass_number:02d})..."
+    )
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for extracted in pool.map(extract_blocks, rows, chunksize=256):
+            if extracted is None:
+                unusable += 1
+                continue
+            blocks = namer.new_blocks(extracted["blocks"])
+            if not blocks:
+                continue
+
+            lang_dir = root_path / extracted["directory"]
+            lang_dir.mkdir(parents=True, exist_ok=True)
+            file_path = lang_dir / namer.file_name(extracted)
+            if file_path.exists() and not args.overwrite:
+                print(f"  -> Skipped {file_path}: already exists (use --overwrite to replace it)")
+                existing += 1
+                continue
+            content = format_snippet(extracted["title"], extracted["extension"], blocks)
+            # CRLF like the rest of the generated corpus; the importer normalizes it
+            with open(file_path, "w", encoding="utf-8", newline="\r\n") as f:
+                f.write(content)
+            print(f"  -> Created {file_path}")
+            created += 1
+
+    print(f"\nSnippet extraction complete: {created} file(s) created.")
+    print(
+        f"Skipped {namer.duplicates} duplicate block(s) and {unusable} result(s) "
+        "without usable code."
+    )
+    if existing:
+        print(f"Kept {existing} existing file(s); pass --overwrite to replace them.")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
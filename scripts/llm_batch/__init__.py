@@ -0,0 +1,6 @@
+"""Shared machinery for the *-api-template.py batch scripts."""
+from llm_batch.dispatch import dispatch
+from llm_batch.ratelimit import RateLimiter, estimate_tokens
+from llm_batch.runner import BatchRunner, RunConfig
+
+__all__ = ["dispatch", "RateLimiter", "estimate_tokens", "BatchRunner", "RunConfig"]
@@ -0,0 +1,15 @@
+"""Run a prompt sheet against the offline fake provider.
+
+    python -m llm_batch ALL_PROMPTS.pkl
+    python -m llm_batch ALL_PROMPTS.parquet
+
+Accepts the same options as the template scripts (--resume, --no-cache).
+"""
+from llm_batch.providers.fake_provider import FakeProvider
+from llm_batch.runner import RunConfig, main
+
+if __name__ == "__main__":
+    main(
+        FakeProvider(latency=0.05),
+        RunConfig(requests_per_minute=6000, max_concurrency=8, cache_file_name=":memory:"),
+    )
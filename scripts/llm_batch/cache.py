@@ -0,0 +1,148 @@
+"""On-disk response cache keyed by everything that determines a completion."""
+import hashlib
+import json
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 1 << 30  # 1 GiB
+
+
+def make_cache_key(model, system_prompt, temperature, max_tokens, prompt):
+    """Content address of a request: sha256 over its canonical JSON form."""
+    payload = json.dumps(
+        [model, system_prompt, temperature, max_tokens, prompt], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed cache of (result text, response fields) pairs with LRU eviction.
+
+    Entries are evicted least-recently-used first once the stored payloads
+    exceed `max_bytes`. The running total is kept in the database and
+    updated in each write transaction, so processes sharing one cache file
+    (sharded runs) evict against the same total. A disabled cache misses every lookup and stores
+    nothing, so callers need no separate bypass path.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        if not enabled:
+            return
+        # Shard processes may hold the write lock; wait for it rather than fail
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # A lost LRU touch or entry after a crash is harmless; skip the fsyncs
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " response BLOB,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        # One row holding SUM(size), so a write does not rescan the table
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_size ("
+            " id INTEGER PRIMARY KEY CHECK (id = 0),"
+            " total INTEGER NOT NULL)"
+        )
+        # Caches from before the total was kept are counted once
+        self._conn.execute(
+            "INSERT OR IGNORE INTO cache_size (id, total)"
+            " SELECT 0, COALESCE(SUM(size), 0) FROM responses"
+        )
+        self._conn.commit()
+        (self._size,) = self._conn.execute("SELECT total FROM cache_size").fetchone()
+
+    def _add_size(self, delta):
+        self._conn.execute("UPDATE cache_size SET total = total + ?", (delta,))
+
+    def get(self, key):
+        """Return the cached (result, response fields) for `key`, or None."""
+        if not self.enabled:
+            self.misses += 1
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        result, blob = row
+        return result, pickle.loads(blob) if blob is not None else None
+
+    def put(self, key, result, fields=None):
+        if not self.enabled:
+            return
+        try:
+            blob = pickle.dumps(fields, protocol=4) if fields is not None else None
+        except Exception as e:
+            logging.debug(f"Caching result without its response fields: {str(e)}")
+            blob = None
+        size = len(result.encode("utf-8")) + (len(blob) if blob else 0)
+        with self._lock:
+            try:
+                # Take the write lock up front so the replaced size and the
+                # total cannot change under us in another process
+                self._conn.execute("BEGIN IMMEDIATE")
+                old = self._conn.execute(
+                    "SELECT size FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, result, response, size, last_used)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (key, result, blob, size, time.time()),
+                )
+                self._add_size(size - (old[0] if old else 0))
+                (self._size,) = self._conn.execute("SELECT total FROM cache_size").fetchone()
+                if self._size > self.max_bytes:
+                    self._evict()
+                self._conn.commit()
+            except sqlite3.Error:
+                self._conn.rollback()
+                raise
+
+    def _evict(self):
+        """Drop least-recently-used entries until the cache fits in max_bytes."""
+        doomed = []
+        freed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ):
+            if self._size - freed <= self.max_bytes:
+                break
+            doomed.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self._add_size(-freed)
+        self._size -= freed
+        logging.info(f"Response cache: evicted {len(doomed)} least recently used entries")
+
+    def summary(self):
+        state = f"{self._size / 1e6:.1f} MB on disk" if self.enabled else "disabled"
+        return f"Response cache: {self.hits} hits, {self.misses} misses ({state})"
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
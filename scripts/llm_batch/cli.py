@@ -0,0 +1,48 @@
+"""Command-line options shared by the *-api-template.py scripts."""
+import argparse
+
+
+def parse_cli_args(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "prompts",
+        nargs="?",
+        help="Prompt file: .pkl, .parquet, .jsonl or .csv (asked for interactively if omitted)",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RESULTS_DIR",
+        help="Continue an interrupted run in RESULTS_DIR, skipping prompts it already completed",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the response cache: always call the API and store nothing",
+    )
+    parser.add_argument(
+        "--raw-responses",
+        action="store_true",
+        help="Also keep the full API responses, compressed, in RESPONSES.journal",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream responses into {id}_result.txt.partial as they are generated",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit the prompts through the provider's asynchronous batch API and poll for results",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Split the prompts by PROMPT_ID into N shards, each run in its own process",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="Send API calls to this URL instead of the provider's (e.g. a local stand-in server)",
+    )
+    return parser.parse_args()
@@ -0,0 +1,45 @@
+"""Bounded-concurrency dispatch of prompt jobs to a worker function."""
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def dispatch(jobs, worker, on_result, max_in_flight=1):
+    """Run `worker(job)` for every job with at most `max_in_flight` calls outstanding.
+
+    `on_result(job, result)` is called on the calling thread as soon as each call
+    finishes, so results can be checkpointed in completion order. `jobs` is
+    consumed lazily; pacing is left to the worker (see ratelimit.RateLimiter).
+
+    Returns the number of jobs dispatched.
+    """
+    jobs = iter(jobs)
+    in_flight = {}
+    slots = max(max_in_flight, 1)
+    exhausted = False
+    dispatched = 0
+
+    with ThreadPoolExecutor(max_workers=slots) as pool:
+        while True:
+            while not exhausted and len(in_flight) < slots:
+                try:
+                    job = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[pool.submit(worker, job)] = job
+                dispatched += 1
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.error(f"Worker failed for job {job!r}: {str(e)}")
+                    result = None
+                on_result(job, result)
+
+    return dispatched
@@ -0,0 +1,374 @@
+"""Append-only checkpoint journal for batch results.
+
+Each result is written once as a length-prefixed, checksummed pickle frame,
+so checkpointing costs O(1) per prompt. The results files are built from the
+collected records once, at the end of the run, and replaced atomically:
+RESULTS.parquet (zstd-compressed, with a fixed schema for the result
+columns, so consumers can read just the columns they need) and, as a legacy
+output, RESULTS.pkl. An interrupted run leaves at most one torn frame at the
+tail of the journal; `iter_journal` stops before it, and `open_checkpoint`
+truncates it before appending.
+
+Raw API responses are not part of the result records. When requested they
+go to RESPONSES.journal, a second journal of zlib-compressed frames.
+"""
+import heapq
+import itertools
+import logging
+import os
+import pickle
+import struct
+import time
+import zlib
+from pathlib import Path
+
+import pandas as pd
+
+JOURNAL_FILE_NAME = "RESULTS.journal"
+RESPONSES_FILE_NAME = "RESPONSES.journal"
+
+RESULT_FORMATS = (".parquet", ".pkl")  # Results files written by default
+
+# Column types of the results; token counts stay integers when some are missing
+RESULT_DTYPES = {
+    "INPUT_TOKENS": "Int64",
+    "OUTPUT_TOKENS": "Int64",
+    "LATENCY": "float64",
+    "ATTEMPTS": "Int64",
+}
+# Arrow types of the result columns, fixed so that every run's RESULTS.parquet
+# has the same schema even when a column is empty. Prompt columns are inferred.
+RESULT_ARROW_TYPES = {
+    "RESULT": "string",
+    "INPUT_TOKENS": "int64",
+    "OUTPUT_TOKENS": "int64",
+    "LATENCY": "float64",
+    "FINISH_REASON": "string",
+    "MODEL": "string",
+    "ATTEMPTS": "int64",
+}
+
+MERGE_BATCH_ROWS = 10_000  # Rows per shard read, and per Parquet write, when merging
+
+_FRAME_HEADER = struct.Struct(">II")  # payload length, crc32
+
+
+class ResultJournal:
+    """Appends result records to `path`, fsyncing in batches."""
+
+    def __init__(self, path, sync_every=32, sync_interval=5.0, compress=False):
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compress = compress
+        self._file = open(self.path, "ab")
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, record):
+        payload = pickle.dumps(record, protocol=4)
+        if self.compress:
+            payload = zlib.compress(payload)
+        self._file.write(_FRAME_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._unsynced += 1
+        if (
+            self._unsynced >= self.sync_every
+            or time.monotonic() - self._last_sync >= self.sync_interval
+        ):
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.sync()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _scan_journal(path, compressed=False):
+    """Yield (record, end_offset) pairs, stopping at a torn or corrupt tail."""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(_FRAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < _FRAME_HEADER.size:
+                logging.warning(f"Ignoring truncated frame header at the end of {path}")
+                return
+            length, crc = _FRAME_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                logging.warning(f"Ignoring torn record at the end of {path}")
+                return
+            if compressed:
+                payload = zlib.decompress(payload)
+            yield pickle.loads(payload), f.tell()
+
+
+def iter_journal(path, compressed=False):
+    """Yield the records of a journal, stopping at a torn or corrupt tail."""
+    for record, _ in _scan_journal(path, compressed):
+        yield record
+
+
+def iter_responses(path):
+    """Yield the {"PROMPT_ID", "RESPONSE"} records of a raw response store."""
+    return iter_journal(path, compressed=True)
+
+
+def _repair_journal(path, compressed=False):
+    """Read a journal and drop its torn tail, if any, so new frames are
+    appended to a readable journal. Returns the intact records."""
+    records = []
+    end = 0
+    for record, end in _scan_journal(path, compressed):
+        records.append(record)
+    if path.stat().st_size != end:
+        os.truncate(path, end)
+    return records
+
+
+def write_results(
+    records, path, sort_by="PROMPT_ID", dtypes=RESULT_DTYPES, formats=RESULT_FORMATS
+):
+    """Build the results DataFrame once and atomically replace the results
+    file of each of `formats` (suffixes), named like `path`.
+
+    Records arrive in completion order; they are sorted by `sort_by`
+    so the output matches the prompt order of a sequential run.
+    """
+    path = Path(path)
+    df = pd.DataFrame(list(records))
+    df = _cast_dtypes(df, dtypes)
+    if sort_by in df.columns:
+        df = df.sort_values(by=sort_by, kind="stable").reset_index(drop=True)
+    for suffix in formats:
+        target = path.with_suffix(suffix)
+        tmp_path = target.with_name(target.name + ".tmp")
+        if suffix == ".parquet":
+            try:
+                _write_parquet(df, tmp_path)
+            except ImportError:
+                logging.warning(f"pyarrow is not installed; {target.name} not written")
+                continue
+        else:
+            df.to_pickle(tmp_path, protocol=4)
+        os.replace(tmp_path, target)
+
+
+def _cast_dtypes(df, dtypes):
+    return df.astype({col: dtype for col, dtype in dtypes.items() if col in df.columns})
+
+
+def _write_parquet(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table.cast(_result_schema(table.schema)), path, compression="zstd")
+
+
+def _result_schema(schema):
+    """`schema` with the fixed Arrow types of the result columns."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field(f.name, pa.type_for_alias(RESULT_ARROW_TYPES[f.name]))
+            if f.name in RESULT_ARROW_TYPES
+            else f
+            for f in schema
+        ],
+        metadata=schema.metadata,
+    )
+
+
+def read_results(path):
+    """Read a results file, Parquet or pickle, into a DataFrame."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def open_checkpoint(results_dir, **journal_options):
+    """Open the checkpoint of a (possibly interrupted) run for appending.
+
+    Returns the records already completed and a journal positioned after the
+    last intact frame. Runs from before the journal existed are migrated by
+    seeding a new journal from their results file. Records from before lean
+    records carry the SDK response in a RESPONSE column; it is dropped, and
+    a journal holding such records is rewritten without it.
+    """
+    results_dir = Path(results_dir)
+    journal_path = results_dir / JOURNAL_FILE_NAME
+    results_path = _existing_results(results_dir / "RESULTS.pkl")
+    records = []
+    if journal_path.exists():
+        records = _repair_journal(journal_path)
+    elif results_path.exists():
+        records = read_results(results_path).to_dict("records")
+
+    legacy = False
+    for record in records:
+        if "RESPONSE" in record:
+            del record["RESPONSE"]
+            legacy = True
+    if legacy and journal_path.exists():
+        tmp_path = journal_path.with_name(journal_path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        tmp_journal = ResultJournal(tmp_path, **journal_options)
+        for record in records:
+            tmp_journal.append(record)
+        tmp_journal.close()
+        os.replace(tmp_path, journal_path)
+
+    journal = ResultJournal(journal_path, **journal_options)
+    if records and journal_path.stat().st_size == 0:
+        for record in records:
+            journal.append(record)
+        journal.sync()
+    return records, journal
+
+
+def open_response_store(results_dir, **journal_options):
+    """Open the raw response store of a run for appending.
+
+    Each frame is a zlib-compressed {"PROMPT_ID", "RESPONSE"} record holding
+    the response as plain data (see Provider.raw_payload).
+    """
+    path = Path(results_dir) / RESPONSES_FILE_NAME
+    if path.exists():
+        _repair_journal(path, compressed=True)
+    return ResultJournal(path, compress=True, **journal_options)
+
+
+def merge_results(paths, path, key="PROMPT_ID", formats=RESULT_FORMATS):
+    """K-way merge of results files that are each sorted by `key` (e.g. the
+    shards of one run) into `path`, without re-sorting the whole set.
+
+    Parquet shards are read a batch at a time and the merged rows are
+    written to RESULTS.parquet in batches, so the merge holds about one
+    batch per shard. A RESULTS.pkl is a single pickled DataFrame; it is
+    then loaded once from the merged Parquet file.
+    """
+    path = Path(path)
+    shard_paths = []
+    for shard_path in map(Path, paths):
+        parquet_path = shard_path.with_suffix(".parquet")
+        shard_paths.append(_refresh_results(parquet_path if parquet_path.exists() else shard_path))
+    merged = heapq.merge(
+        *(_iter_records(shard_path) for shard_path in shard_paths),
+        key=lambda record: record[key],
+    )
+    if ".parquet" not in formats:
+        write_results(merged, path, sort_by=None, formats=formats)
+        return
+    target = path.with_suffix(".parquet")
+    try:
+        _write_parquet_batches(merged, target, shard_paths)
+    except ImportError:
+        logging.warning(f"pyarrow is not installed; {target.name} not written")
+        others = [suffix for suffix in formats if suffix != ".parquet"]
+        write_results(merged, path, sort_by=None, formats=others)
+        return
+    for suffix in formats:
+        if suffix != ".parquet":
+            df = read_results(target)
+            df = _cast_dtypes(df, RESULT_DTYPES)
+            pickle_path = path.with_suffix(suffix)
+            tmp_path = pickle_path.with_name(pickle_path.name + ".tmp")
+            df.to_pickle(tmp_path, protocol=4)
+            os.replace(tmp_path, pickle_path)
+
+
+def _iter_records(path):
+    """The records of a results file, read a batch at a time from Parquet.
+    A pickle can only be loaded whole, but its rows are still yielded one
+    at a time rather than copied into a list of dicts."""
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=MERGE_BATCH_ROWS):
+            yield from batch.to_pylist()
+        return
+    df = pd.read_pickle(path)
+    columns = list(df.columns)
+    for row in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, row))
+
+
+def _write_parquet_batches(records, path, shard_paths):
+    """Write `records` to `path` as Parquet, MERGE_BATCH_ROWS at a time.
+    The schema is that of the Parquet shards, so a column that is empty in
+    the first batch keeps the type it has in the rest."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    shard_schemas = [pq.read_schema(p) for p in shard_paths if p.suffix == ".parquet"]
+    schema = None
+    if shard_schemas:
+        schema = _result_schema(pa.unify_schemas(shard_schemas, promote_options="permissive"))
+    tmp_path = path.with_name(path.name + ".tmp")
+    writer = None
+    try:
+        while True:
+            chunk = list(itertools.islice(records, MERGE_BATCH_ROWS))
+            if not chunk and writer is not None:
+                break
+            df = pd.DataFrame(chunk)
+            df = _cast_dtypes(df, RESULT_DTYPES)
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if schema is None:
+                schema = _result_schema(table.schema)
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_path, schema, compression="zstd")
+            if chunk:
+                writer.write_table(table.select(schema.names).cast(schema))
+            if len(chunk) < MERGE_BATCH_ROWS:
+                break
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+
+
+def _existing_results(path):
+    """`path`, or the same results in another format if only that exists
+    (e.g. RESULTS.parquet of a run that did not write RESULTS.pkl)."""
+    if path.exists():
+        return path
+    others = (path.with_suffix(suffix) for suffix in RESULT_FORMATS)
+    return next((other for other in others if other.exists()), path)
+
+
+def load_results(path):
+    """Load a results file (RESULTS.parquet or RESULTS.pkl), rebuilding it
+    from the journal when that is newer (the run was interrupted, or resumed
+    and not yet finished)."""
+    return read_results(_refresh_results(Path(path)))
+
+
+def _refresh_results(path):
+    """The results file at `path` (or in another format), rebuilt from the
+    journal first if that is newer."""
+    path = _existing_results(path)
+    journal_path = path.with_name(JOURNAL_FILE_NAME)
+    if journal_path.exists() and (
+        not path.exists() or journal_path.stat().st_mtime > path.stat().st_mtime
+    ):
+        logging.info(f"Rebuilding {path} from {journal_path}")
+        write_results(iter_journal(journal_path), path, formats=(path.suffix,))
+    return path
@@ -0,0 +1,188 @@
+"""Per-request telemetry (METRICS.jsonl) and the end-of-run summary."""
+import json
+import logging
+import math
+import threading
+import time
+from datetime import datetime
+
+# List prices in USD per million (input, output) tokens. A model is priced
+# by the longest key its name starts with; update these when prices change,
+# or override them per template through RunConfig.model_prices.
+MODEL_PRICES = {
+    "claude-3-opus": (15.00, 75.00),
+    "claude-3-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-opus-4": (15.00, 75.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "fake-model": (0.0, 0.0),
+}
+BATCH_DISCOUNT = 0.5  # Batch API requests are billed at half price
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def price_for(model, prices=MODEL_PRICES):
+    """Return the (input, output) USD per million tokens of `model`, or None."""
+    matches = [key for key in prices if model and model.startswith(key)]
+    return prices[max(matches, key=len)] if matches else None
+
+
+def request_cost(model, input_tokens, output_tokens, prices=MODEL_PRICES, batch=False):
+    """USD cost of one request, or None for unpriced models or unknown usage."""
+    price = price_for(model, prices)
+    if price is None or input_tokens is None or output_tokens is None:
+        return None
+    cost = (input_tokens * price[0] + output_tokens * price[1]) / 1e6
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class MetricsLog:
+    """Appends one JSON line per request to `path` and aggregates the run.
+
+    Timings are in seconds: `queue_wait` from the prompt being read to its
+    first API call going out (thread pool queue and rate limiter waits),
+    `ttfb` until the response headers arrived, `ttft` until the first text
+    chunk arrived (--stream only), and `latency` for the whole successful
+    call.
+    """
+
+    TIMINGS = ("queue_wait", "ttfb", "ttft", "latency")
+
+    def __init__(self, path, prices=MODEL_PRICES):
+        self.prices = prices
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+        self._timings = {name: [] for name in self.TIMINGS}
+        self._counts = {"ok": 0, "cached": 0, "failed": 0}
+        self._totals = {"input_tokens": 0, "output_tokens": 0, "retries": 0, "cost": 0.0}
+        self._unpriced = set()
+
+    def record(
+        self,
+        prompt_id,
+        outcome,
+        model=None,
+        input_tokens=None,
+        output_tokens=None,
+        attempts=None,
+        batch=False,
+        **timings,
+    ):
+        """Log one request. `outcome` is "ok", "cached" or "failed"."""
+        cost = None
+        if outcome == "ok":
+            cost = request_cost(model, input_tokens, output_tokens, self.prices, batch)
+        entry = {
+            "time": datetime.now().isoformat(timespec="milliseconds"),
+            "prompt_id": prompt_id,
+            "outcome": outcome,
+            "model": model,
+            **{name: _round(timings.get(name)) for name in self.TIMINGS},
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "retries": max(0, attempts - 1) if attempts else 0,
+            "cost": cost,
+        }
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._counts[outcome] += 1
+            self._totals["retries"] += entry["retries"]
+            if outcome != "ok":
+                return
+            for name in self.TIMINGS:
+                if timings.get(name) is not None:
+                    self._timings[name].append(timings[name])
+            self._totals["input_tokens"] += input_tokens or 0
+            self._totals["output_tokens"] += output_tokens or 0
+            if cost is None:
+                self._unpriced.add(model)
+            else:
+                self._totals["cost"] += cost
+
+    def summary(self):
+        """Percentiles and throughput of the run so far, as a dict."""
+        with self._lock:
+            elapsed = max(time.monotonic() - self.started, 1e-9)
+            summary = {
+                "wall_time": round(elapsed, 3),
+                "requests": dict(self._counts),
+                **self._totals,
+                "cost": round(self._totals["cost"], 6),
+                "unpriced_models": sorted(str(model) for model in self._unpriced),
+                "requests_per_minute": round(self._counts["ok"] / elapsed * 60, 2),
+                "output_tokens_per_second": round(
+                    self._totals["output_tokens"] / elapsed, 2
+                ),
+            }
+            for name in self.TIMINGS:
+                values = sorted(self._timings[name])
+                summary[name] = {
+                    f"p{p}": _round(percentile(values, p)) for p in PERCENTILES
+                }
+                summary[name]["max"] = _round(values[-1] if values else None)
+        return summary
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def format_summary(summary):
+    """Human-readable lines for the log and console."""
+    requests = summary["requests"]
+    lines = [
+        f"Requests: {requests['ok']} ok, {requests['cached']} cached, "
+        f"{requests['failed']} failed, {summary['retries']} retries "
+        f"in {summary['wall_time']:.1f} seconds",
+        f"Throughput: {summary['requests_per_minute']:.1f} requests/min, "
+        f"{summary['output_tokens_per_second']:.1f} output tokens/s",
+        f"Tokens: {summary['input_tokens']} in, {summary['output_tokens']} out; "
+        f"cost ${summary['cost']:.4f}",
+    ]
+    if summary["unpriced_models"]:
+        lines.append(f"No price known for: {', '.join(summary['unpriced_models'])}")
+    for name in MetricsLog.TIMINGS:
+        stats = summary[name]
+        if stats["max"] is None:
+            continue
+        values = ", ".join(f"{key} {value:.3f}" for key, value in stats.items())
+        lines.append(f"{name} (s): {values}")
+    return lines
+
+
+def write_summary(summary, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+    logging.info(f"Run metrics written to {path}")
+
+
+def _round(value):
+    return round(value, 4) if value is not None else None
@@ -0,0 +1,144 @@
+"""Streaming readers for prompt sheets.
+
+Rows are yielded as (PROMPT_ID, prompt, *additional values) tuples straight
+from the file, so memory stays bounded by one chunk and the first request
+can go out as soon as the first chunk is parsed:
+
+- .parquet: one record batch at a time (requires pyarrow)
+- .jsonl / .ndjson: one JSON object per line
+- .csv: `chunk_size` rows at a time
+- .pkl: loaded whole, since a pickle cannot be read incrementally
+"""
+import json
+import logging
+import zlib
+from pathlib import Path
+
+import pandas as pd
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+CSV_SUFFIXES = {".csv"}
+PICKLE_SUFFIXES = {".pkl", ".pickle"}
+
+
+def shard_of(prompt_id, shard_count):
+    """The shard of a PROMPT_ID; stable across processes and runs, unlike hash()."""
+    return zlib.crc32(str(prompt_id).encode("utf-8")) % shard_count
+
+
+class PromptSource:
+    """An iterable over the rows of a prompt file, read lazily.
+
+    Opening the source only reads the header (or schema) to validate the
+    columns; `total` is the row count when the format records it up front
+    (Parquet, pickle) and None otherwise. With `shard=(index, count)` only
+    the rows whose PROMPT_ID falls in that shard are yielded.
+    """
+
+    def __init__(
+        self,
+        path,
+        index_column="PROMPT_ID",
+        prompt_column="PROMPT",
+        additional_columns=(),
+        chunk_size=1024,
+        shard=None,
+    ):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self.shard = shard
+        self.total = None
+        self._df = None
+        self._parquet = None
+        suffix = self.path.suffix.lower()
+        if suffix in PARQUET_SUFFIXES:
+            self.format = "parquet"
+            self.columns = self._open_parquet()
+        elif suffix in JSONL_SUFFIXES:
+            self.format = "jsonl"
+            self.columns = self._jsonl_header()
+        elif suffix in CSV_SUFFIXES:
+            self.format = "csv"
+            self.columns = list(pd.read_csv(self.path, nrows=0).columns)
+        else:
+            if suffix not in PICKLE_SUFFIXES:
+                logging.warning(f"Unknown prompt file type {suffix!r}; reading it as a pickle")
+            self.format = "pickle"
+            self._df = pd.read_pickle(self.path)
+            self.columns = list(self._df.columns)
+            self.total = len(self._df)
+
+        for col in (prompt_column, index_column):
+            if col not in self.columns:
+                raise KeyError(f"'{col}' column not found in the input file")
+        self.extra_columns = [
+            col for col in dict.fromkeys(additional_columns) if col in self.columns
+        ]
+        for col in additional_columns:
+            if col not in self.columns:
+                logging.warning(f"Column '{col}' not found in the input file")
+        # Row layout; an extra column may repeat the prompt (e.g. PROMPT kept in the results)
+        self.selected_columns = [index_column, prompt_column, *self.extra_columns]
+        # Each column read once; rows are assembled from it by name
+        self._read_columns = list(dict.fromkeys(self.selected_columns))
+        if shard is not None:
+            self.total = None
+
+    def _open_parquet(self):
+        import pyarrow.parquet as pq
+
+        self._parquet = pq.ParquetFile(self.path)
+        self.total = self._parquet.metadata.num_rows
+        return list(self._parquet.schema_arrow.names)
+
+    def _jsonl_header(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    return list(json.loads(line))
+        return []
+
+    def __iter__(self):
+        rows = self._iter_rows()
+        if self.shard is None:
+            return rows
+        index, count = self.shard
+        return (row for row in rows if shard_of(row[0], count) == index)
+
+    def _iter_rows(self):
+        if self.format == "parquet":
+            return self._iter_parquet()
+        if self.format == "jsonl":
+            return self._iter_jsonl()
+        if self.format == "csv":
+            return self._iter_csv()
+        return self._df[self.selected_columns].itertuples(index=False, name=None)
+
+    def _iter_parquet(self):
+        for batch in self._parquet.iter_batches(
+            batch_size=self.chunk_size, columns=self._read_columns
+        ):
+            columns = {name: batch.column(name).to_pylist() for name in self._read_columns}
+            yield from zip(*(columns[name] for name in self.selected_columns))
+
+    def _iter_jsonl(self):
+        index_column, prompt_column = self.selected_columns[:2]
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if index_column not in record or prompt_column not in record:
+                    logging.warning(
+                        f"Skipping line {line_number} of {self.path}: missing "
+                        f"'{index_column}' or '{prompt_column}'"
+                    )
+                    continue
+                yield tuple(record.get(col) for col in self.selected_columns)
+
+    def _iter_csv(self):
+        for chunk in pd.read_csv(
+            self.path, usecols=self._read_columns, chunksize=self.chunk_size
+        ):
+            yield from chunk[self.selected_columns].itertuples(index=False, name=None)
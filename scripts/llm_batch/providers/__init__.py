@@ -0,0 +1,5 @@
+"""Provider adapters for the batch runner.
+
+Each adapter lives in its own module and imports its SDK there, so a
+template that imports only its own adapter needs only that SDK installed.
+"""
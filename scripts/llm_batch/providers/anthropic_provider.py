@@ -0,0 +1,86 @@
+"""Anthropic Messages API adapter."""
+import logging
+import sys
+import time
+
+from anthropic import Anthropic
+
+from llm_batch.providers.base import ContentBlockedError, Provider
+
+
+class AnthropicProvider(Provider):
+    name = "Anthropic"
+    api_key_env = "ANTHROPIC_API_KEY"
+    supports_batch = True
+    supports_streaming = True
+
+    def setup(self):
+        self.client = Anthropic(api_key=self.get_api_key(), base_url=self.base_url)
+        try:
+            # There's no direct method to list models, so we'll make a simple API call to test authentication
+            self.client.messages.create(
+                model=self.model,
+                max_tokens=10,
+                messages=[{"role": "user", "content": "Hello"}],
+            )
+            logging.info("Anthropic API authentication successful.")
+        except Exception as e:
+            logging.error(f"An error occurred while setting up the Anthropic API: {str(e)}")
+            sys.exit(1)
+
+    def _message_params(self, prompt_text):
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "system": self.system_prompt,
+            "messages": [{"role": "user", "content": prompt_text}],
+        }
+
+    def generate(self, prompt_text):
+        started = time.perf_counter()
+        # A streamed response returns once the headers are in; parse() reads the body
+        with self.client.messages.with_streaming_response.create(
+            **self._message_params(prompt_text)
+        ) as raw_response:
+            ttfb = time.perf_counter() - started
+            return raw_response.parse(), raw_response.headers, ttfb
+
+    def stream(self, prompt_text, on_text):
+        started = time.perf_counter()
+        with self.client.messages.stream(**self._message_params(prompt_text)) as stream:
+            ttfb = time.perf_counter() - started
+            for text in stream.text_stream:
+                on_text(text)
+            return stream.get_final_message(), stream.response.headers, ttfb
+
+    def extract_text(self, response):
+        if response.stop_reason == "refusal":
+            raise ContentBlockedError("The model refused to answer the prompt")
+        return response.content[0].text
+
+    def usage(self, response):
+        return response.usage.input_tokens, response.usage.output_tokens
+
+    def finish_reason(self, response):
+        return response.stop_reason
+
+    # Message Batches API
+
+    def batch_request(self, custom_id, prompt_text):
+        return {"custom_id": custom_id, "params": self._message_params(prompt_text)}
+
+    def submit_batch(self, requests):
+        return self.client.messages.batches.create(requests=requests).id
+
+    def batch_done(self, batch_id):
+        batch = self.client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    def batch_results(self, batch_id):
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                yield entry.custom_id, entry.result.message, None
+            else:
+                error = getattr(entry.result, "error", None) or entry.result.type
+                yield entry.custom_id, None, error
@@ -0,0 +1,115 @@
+"""Interface every provider adapter implements."""
+import dataclasses
+import logging
+import os
+
+from llm_batch.cache import make_cache_key
+
+
+class ContentBlockedError(Exception):
+    """The provider refused to answer the prompt, e.g. for safety reasons."""
+
+
+class Provider:
+    """Adapter between the batch runner and one LLM API.
+
+    Subclasses implement `setup`, `generate`, `extract_text` and `usage`;
+    everything else (concurrency, rate limiting, checkpointing, caching)
+    lives in the runner.
+    """
+
+    name = "Provider"
+    api_key_env = None  # Environment variable checked before prompting for a key
+    base_url = None  # Overrides the SDK's API endpoint, e.g. for a local stand-in server
+    supports_batch = False  # Whether the batch_* methods are implemented
+    supports_streaming = False  # Whether `stream` is implemented
+
+    def __init__(self, model, max_tokens, temperature, system_prompt=None):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self.system_prompt = system_prompt
+
+    def get_api_key(self):
+        api_key = os.getenv(self.api_key_env) if self.api_key_env else None
+        if api_key:
+            print(f"{self.name} API key found in environment variables.")
+            logging.info(f"{self.name} API key found in environment variables.")
+            return api_key
+        print(f"{self.name} API key not found in environment variables. Please enter it now.")
+        logging.info(
+            f"{self.name} API key not found in environment variables. Please enter it now."
+        )
+        return input(f"Paste your {self.name} API key: ").strip()
+
+    def preload_api_key(self):
+        """Ask for a missing API key once, in this process, and export it so
+        that worker processes find it in the environment."""
+        if self.api_key_env and not os.getenv(self.api_key_env):
+            os.environ[self.api_key_env] = self.get_api_key()
+
+    def split_rate_budget(self, parts):
+        """Divide any rate budget the adapter keeps itself between `parts`
+        processes. The runner's own budget is divided separately."""
+
+    def setup(self):
+        """Authenticate and build the client; exit the process on failure."""
+        raise NotImplementedError
+
+    def generate(self, prompt_text):
+        """Send one prompt. Returns (response, rate limit headers or None,
+        seconds until the response headers arrived or None)."""
+        raise NotImplementedError
+
+    def stream(self, prompt_text, on_text):
+        """Send one prompt through the streaming API, calling `on_text` with
+        each text chunk as it arrives. Returns the same tuple as `generate`,
+        with the complete response assembled from the stream."""
+        raise NotImplementedError(f"The {self.name} adapter has no streaming support")
+
+    def extract_text(self, response):
+        raise NotImplementedError
+
+    def usage(self, response):
+        """Return (input_tokens, output_tokens) for a response."""
+        raise NotImplementedError
+
+    def finish_reason(self, response):
+        """Why generation stopped (e.g. "end_turn", "length"), if reported."""
+        return None
+
+    def response_model(self, response):
+        """The model version that served the response."""
+        return getattr(response, "model", None) or self.model
+
+    def raw_payload(self, response):
+        """`response` as plain data for the raw response store, so reading the
+        store back does not need the provider's SDK."""
+        if hasattr(response, "model_dump"):
+            return response.model_dump(mode="json")
+        if hasattr(response, "to_dict"):
+            return response.to_dict()
+        if dataclasses.is_dataclass(response):
+            return dataclasses.asdict(response)
+        return repr(response)
+
+    def batch_request(self, custom_id, prompt_text):
+        """One entry of a batch submission, in the provider's own format."""
+        raise NotImplementedError(f"The {self.name} adapter has no batch API support")
+
+    def submit_batch(self, requests):
+        """Submit batch entries; returns the provider's batch ID."""
+        raise NotImplementedError(f"The {self.name} adapter has no batch API support")
+
+    def batch_done(self, batch_id):
+        """True once the provider has stopped processing the batch."""
+        raise NotImplementedError(f"The {self.name} adapter has no batch API support")
+
+    def batch_results(self, batch_id):
+        """Yield (custom_id, response, error) for every request of a finished batch."""
+        raise NotImplementedError(f"The {self.name} adapter has no batch API support")
+
+    def cache_key(self, prompt_text):
+        return make_cache_key(
+            self.model, self.system_prompt, self.temperature, self.max_tokens, prompt_text
+        )
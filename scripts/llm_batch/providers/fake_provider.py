@@ -0,0 +1,105 @@
+"""Offline stand-in provider for exercising the runner without an API key."""
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass
+
+from llm_batch.providers.base import Provider
+
+
+@dataclass
+class FakeResponse:
+    text: str
+    input_tokens: int
+    output_tokens: int
+
+
+class FakeProviderError(Exception):
+    """Simulated API failure; `status_code` mimics the SDK exceptions."""
+
+    def __init__(self, message, status_code=500):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class FakeProvider(Provider):
+    """Echoes each prompt back after `latency` seconds.
+
+    `failure_rate` of the calls raise a FakeProviderError, so retry and
+    recovery paths can be tested offline.
+    """
+
+    name = "Fake"
+    supports_batch = True
+    supports_streaming = True
+
+    def __init__(
+        self,
+        model="fake-model",
+        max_tokens=4096,
+        temperature=0.0,
+        system_prompt=None,
+        latency=0.0,
+        failure_rate=0.0,
+        seed=None,
+        batch_polls=1,
+    ):
+        super().__init__(model, max_tokens, temperature, system_prompt)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        # Batches report "still running" for `batch_polls` checks before finishing
+        self.batch_polls = batch_polls
+        self._batches = {}
+
+    def setup(self):
+        logging.info("Fake provider ready; no API calls will be made.")
+
+    def generate(self, prompt_text):
+        if self.latency:
+            time.sleep(self.latency)
+        if self._random.random() < self.failure_rate:
+            raise FakeProviderError("Simulated provider failure")
+        text = f"Response to: {prompt_text}"
+        response = FakeResponse(text, len(prompt_text) // 4, len(text) // 4)
+        return response, None, self.latency
+
+    def stream(self, prompt_text, on_text):
+        response, headers, ttfb = self.generate(prompt_text)
+        for word in re.split(r"(?<= )", response.text):
+            on_text(word)
+        return response, headers, ttfb
+
+    def extract_text(self, response):
+        return response.text
+
+    def usage(self, response):
+        return response.input_tokens, response.output_tokens
+
+    def finish_reason(self, response):
+        return "stop"
+
+    # In-memory batch API
+
+    def batch_request(self, custom_id, prompt_text):
+        return {"custom_id": custom_id, "prompt": prompt_text}
+
+    def submit_batch(self, requests):
+        batch_id = f"fake-batch-{len(self._batches) + 1}"
+        self._batches[batch_id] = {"requests": list(requests), "polls": self.batch_polls}
+        return batch_id
+
+    def batch_done(self, batch_id):
+        batch = self._batches[batch_id]
+        batch["polls"] -= 1
+        return batch["polls"] < 0
+
+    def batch_results(self, batch_id):
+        for request in self._batches[batch_id]["requests"]:
+            try:
+                response, _, _ = self.generate(request["prompt"])
+            except FakeProviderError as e:
+                yield request["custom_id"], None, str(e)
+                continue
+            yield request["custom_id"], response, None
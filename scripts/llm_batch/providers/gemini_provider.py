@@ -0,0 +1,107 @@
+"""Google Gemini adapter."""
+import logging
+import sys
+
+import google.generativeai as genai
+
+from llm_batch.cache import make_cache_key
+from llm_batch.providers.base import ContentBlockedError, Provider
+
+SAFETY_CATEGORIES = [
+    "HARM_CATEGORY_HARASSMENT",
+    "HARM_CATEGORY_HATE_SPEECH",
+    "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+    "HARM_CATEGORY_DANGEROUS_CONTENT",
+]
+
+# Finish reasons of candidates whose text was withheld
+BLOCKED_FINISH_REASONS = {"SAFETY", "RECITATION", "BLOCKLIST", "PROHIBITED_CONTENT"}
+
+
+class GeminiProvider(Provider):
+    name = "Google"
+    api_key_env = "GEMINI_API_KEY"
+    supports_streaming = True
+
+    def __init__(self, model, max_tokens, temperature, system_prompt=None, json_output=False):
+        super().__init__(model, max_tokens, temperature, system_prompt)
+        self.json_output = json_output
+
+    def setup(self):
+        genai.configure(api_key=self.get_api_key())
+
+        generation_config = {
+            "temperature": self.temperature,
+            "top_p": 1,
+            "top_k": 1,
+            "max_output_tokens": self.max_tokens,
+        }
+
+        # Configure the model for JSON output
+        if self.json_output:
+            generation_config["response_mime_type"] = "application/json"
+            logging.info("JSON output mode enabled. The model will return JSON objects.")
+            print("JSON output mode enabled. The model will return JSON objects.")
+
+        safety_settings = [
+            {"category": category, "threshold": "BLOCK_NONE"}
+            for category in SAFETY_CATEGORIES
+        ]
+
+        try:
+            self.client = genai.GenerativeModel(
+                model_name=self.model,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                system_instruction=self.system_prompt,
+            )
+            # Test the model with a simple prompt
+            self.client.generate_content("Hello")
+            logging.info("Gemini API authentication and model setup successful.")
+        except Exception as e:
+            logging.error(f"An error occurred while setting up the Gemini API: {str(e)}")
+            sys.exit(1)
+
+    def generate(self, prompt_text):
+        # Gemini exposes no rate limit headers or timings; 429s still reach the limiter
+        return self.client.generate_content(prompt_text), None, None
+
+    def stream(self, prompt_text, on_text):
+        response = self.client.generate_content(prompt_text, stream=True)
+        for chunk in response:
+            if chunk.candidates and chunk.parts:
+                on_text(chunk.text)
+        # The iterated response has aggregated the chunks, usage included
+        return response, None, None
+
+    def extract_text(self, response):
+        block_reason = response.prompt_feedback.block_reason
+        if block_reason:
+            raise ContentBlockedError(f"Prompt blocked: {block_reason.name}")
+        finish_reason = self.finish_reason(response)
+        if finish_reason in BLOCKED_FINISH_REASONS:
+            raise ContentBlockedError(f"Response blocked: {finish_reason}")
+        return response.text
+
+    def usage(self, response):
+        metadata = response.usage_metadata
+        # Output includes thinking tokens, which count against the quota too
+        return (
+            metadata.prompt_token_count,
+            metadata.total_token_count - metadata.prompt_token_count,
+        )
+
+    def finish_reason(self, response):
+        if not response.candidates:
+            return None
+        return response.candidates[0].finish_reason.name
+
+    def cache_key(self, prompt_text):
+        output_mode = "application/json" if self.json_output else None
+        return make_cache_key(
+            [self.model, output_mode],
+            self.system_prompt,
+            self.temperature,
+            self.max_tokens,
+            prompt_text,
+        )
@@ -0,0 +1,155 @@
+"""OpenAI Chat Completions adapter, also used for OpenAI-compatible APIs."""
+import json
+import logging
+import sys
+import time
+
+import openai
+from openai import OpenAI
+from openai.types.chat import ChatCompletion
+
+from llm_batch.providers.base import ContentBlockedError, Provider
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+class OpenAIProvider(Provider):
+    name = "OpenAI"
+    api_key_env = "OPENAI_API_KEY"
+    supports_batch = True
+    supports_streaming = True
+
+    def setup(self):
+        self.client = OpenAI(api_key=self.get_api_key(), base_url=self.base_url)
+        try:
+            self.client.models.list()
+            logging.info(f"{self.name} API authentication successful.")
+        except openai.AuthenticationError:
+            logging.error("Authentication failed. Please check your API key.")
+            sys.exit(1)
+        except Exception as e:
+            logging.error(f"An error occurred while setting up the {self.name} API: {str(e)}")
+            sys.exit(1)
+
+    def _completion_params(self, prompt_text):
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt_text},
+            ],
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "top_p": 1,
+            "frequency_penalty": 0,
+            "presence_penalty": 0,
+        }
+
+    def generate(self, prompt_text):
+        started = time.perf_counter()
+        # A streamed response returns once the headers are in; parse() reads the body
+        with self.client.chat.completions.with_streaming_response.create(
+            **self._completion_params(prompt_text)
+        ) as raw_response:
+            ttfb = time.perf_counter() - started
+            return raw_response.parse(), raw_response.headers, ttfb
+
+    def stream(self, prompt_text, on_text):
+        started = time.perf_counter()
+        raw_response = self.client.chat.completions.with_raw_response.create(
+            **self._completion_params(prompt_text),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        ttfb = time.perf_counter() - started
+        content, finish_reason, usage, chunk = [], None, None, None
+        for chunk in raw_response.parse():
+            # The last chunk carries the usage and no choices
+            usage = chunk.usage or usage
+            for choice in chunk.choices:
+                if choice.delta.content:
+                    content.append(choice.delta.content)
+                    on_text(choice.delta.content)
+                finish_reason = choice.finish_reason or finish_reason
+        if chunk is None:
+            # Nothing to build a response from; retried like a dropped connection
+            raise ConnectionError("The stream ended before its first chunk")
+        response = ChatCompletion.model_validate(
+            {
+                "id": chunk.id,
+                "object": "chat.completion",
+                "created": chunk.created,
+                "model": chunk.model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "".join(content)},
+                        "finish_reason": finish_reason,
+                    }
+                ],
+                "usage": usage.model_dump() if usage else None,
+            }
+        )
+        return response, raw_response.headers, ttfb
+
+    def extract_text(self, response):
+        choice = response.choices[0]
+        if choice.finish_reason == "content_filter":
+            raise ContentBlockedError("The response was withheld by the content filter")
+        return choice.message.content
+
+    def usage(self, response):
+        return response.usage.prompt_tokens, response.usage.completion_tokens
+
+    def finish_reason(self, response):
+        return response.choices[0].finish_reason
+
+    # Batch API: requests are uploaded as a JSONL file, results come back as one
+
+    def batch_request(self, custom_id, prompt_text):
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": self._completion_params(prompt_text),
+        }
+
+    def submit_batch(self, requests):
+        payload = "\n".join(json.dumps(request) for request in requests)
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", payload.encode("utf-8")), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window="24h",
+        )
+        return batch.id
+
+    def batch_done(self, batch_id):
+        return self.client.batches.retrieve(batch_id).status in BATCH_FINAL_STATUSES
+
+    def batch_results(self, batch_id):
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            logging.warning(f"Batch {batch_id} ended with status '{batch.status}'")
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    yield entry["custom_id"], None, entry.get("error") or response.get("body")
+                else:
+                    yield entry["custom_id"], ChatCompletion.model_validate(response["body"]), None
+
+
+class DeepSeekProvider(OpenAIProvider):
+    name = "DeepSeek"
+    api_key_env = "DEEPSEEK_API_KEY"
+    base_url = "https://api.deepseek.com"
+    supports_batch = False  # DeepSeek has no batch endpoint
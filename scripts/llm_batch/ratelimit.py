@@ -0,0 +1,176 @@
+"""Token-bucket rate limiting by requests/min and tokens/min."""
+import logging
+import threading
+import time
+
+# Pause applied after a 429 that carries no Retry-After header
+DEFAULT_BACKOFF = 5.0
+
+REMAINING_REQUESTS_HEADERS = (
+    "x-ratelimit-remaining-requests",
+    "anthropic-ratelimit-requests-remaining",
+)
+REMAINING_TOKENS_HEADERS = (
+    "x-ratelimit-remaining-tokens",
+    "anthropic-ratelimit-tokens-remaining",
+)
+
+
+def estimate_tokens(text):
+    """Rough token count for budgeting (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def usage_tokens(input_tokens, output_tokens):
+    """Tokens a call used, or None if the provider did not report both counts."""
+    if input_tokens is None or output_tokens is None:
+        return None
+    return input_tokens + output_tokens
+
+
+def _header(headers, names):
+    """Return the first of `names` present in `headers` as a float, else None."""
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            logging.debug(f"Ignoring non-numeric rate limit header {name}={value!r}")
+    return None
+
+
+def retry_after(error):
+    """Seconds the provider asked us to wait in the error's Retry-After
+    headers, or None."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    retry_after_ms = _header(headers, ("retry-after-ms",))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return _header(headers, ("retry-after",))
+
+
+class TokenBucket:
+    """A bucket holding up to one minute of budget, refilled continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` is available. Requests larger than the bucket
+        wait for a full bucket instead of blocking forever."""
+        needed = min(amount, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def consume(self, amount):
+        # May go negative: a response that used more than estimated is paid back
+        # before the next call goes out.
+        self.level -= amount
+
+    def clamp(self, remaining):
+        self.level = min(self.level, remaining)
+
+
+class RateLimiter:
+    """Thread-safe limiter shared by all dispatch workers.
+
+    Calls go through as soon as both the request and token budgets allow.
+    Provider rate limit headers and 429 errors shrink the budget or pause it.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute=None):
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._paused_until = 0.0
+
+    def __getstate__(self):
+        # Picklable for sharded runs; each process gets its own lock
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _buckets(self):
+        return [b for b in (self._requests, self._tokens) if b is not None]
+
+    def acquire(self, tokens=0):
+        """Block until one request and `tokens` estimated tokens are available."""
+        while True:
+            wait = self._take(tokens)
+            if wait <= 0:
+                return
+            logging.debug(f"Rate limiting: waiting {wait:.2f} seconds for budget")
+            time.sleep(wait)
+
+    def try_acquire(self, tokens=0):
+        """Take one request and `tokens` tokens if they are available right
+        now; return False instead of waiting otherwise."""
+        return self._take(tokens) <= 0
+
+    def _take(self, tokens):
+        """Consume the budget and return 0, or return the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            for bucket in self._buckets():
+                bucket.refill(now)
+            wait = max(self._paused_until - now, self._requests.wait_time(1))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.wait_time(tokens))
+            if wait <= 0:
+                self._requests.consume(1)
+                if self._tokens is not None:
+                    self._tokens.consume(tokens)
+            return wait
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token budget once the real usage of a call is known."""
+        if self._tokens is None or actual_tokens is None:
+            return
+        with self._lock:
+            self._tokens.consume(actual_tokens - estimated_tokens)
+
+    def observe_headers(self, headers):
+        """Align the budget with the provider's own rate limit headers."""
+        if not headers:
+            return
+        remaining_requests = _header(headers, REMAINING_REQUESTS_HEADERS)
+        remaining_tokens = _header(headers, REMAINING_TOKENS_HEADERS)
+        retry_after = _header(headers, ("retry-after",))
+        with self._lock:
+            if remaining_requests is not None:
+                self._requests.clamp(remaining_requests)
+            if remaining_tokens is not None and self._tokens is not None:
+                self._tokens.clamp(remaining_tokens)
+            if retry_after is not None:
+                self._pause(retry_after)
+
+    def observe_error(self, error):
+        """Pause all workers when `error` is a provider 429 response."""
+        status = getattr(error, "status_code", None) or getattr(error, "code", None)
+        if status != 429:
+            return
+        pause = retry_after(error)
+        if pause is None:
+            pause = DEFAULT_BACKOFF
+        logging.warning(f"Rate limited by provider: pausing for {pause:.1f} seconds")
+        with self._lock:
+            self._requests.clamp(0)
+            self._pause(pause)
+
+    def _pause(self, seconds):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,155 @@
+"""Retries of failed API calls, with every attempt logged.
+
+Errors are classified by duck typing on the SDK exceptions (status codes
+and class names), so no provider SDK needs to be imported here:
+
+- retryable: rate limits, overload, 5xx, timeouts and connection errors
+- blocked: the provider refused the content; retrying cannot help
+- fatal: everything else, e.g. authentication or invalid requests
+"""
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+
+from llm_batch.providers.base import ContentBlockedError
+from llm_batch.ratelimit import retry_after
+
+RETRYABLE = "retryable"
+BLOCKED = "blocked"
+FATAL = "fatal"
+
+# 408 timeout, 409 conflict, 429 rate limit, 529 Anthropic overloaded
+RETRYABLE_STATUS_CODES = {408, 409, 429, 529}
+RETRYABLE_ERROR_NAMES = (
+    "Timeout",
+    "Connection",
+    "Overloaded",
+    "RateLimit",
+    "ResourceExhausted",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "InternalServerError",
+)
+BLOCKED_ERROR_NAMES = ("BlockedPrompt", "StopCandidate")
+BLOCKED_ERROR_CODES = ("content_policy_violation", "content_filter")
+
+
+def error_status(error):
+    """The HTTP status code carried by an SDK exception, if any."""
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error):
+    """Return RETRYABLE, BLOCKED or FATAL for an exception raised by a call."""
+    name = type(error).__name__
+    if isinstance(error, ContentBlockedError) or any(n in name for n in BLOCKED_ERROR_NAMES):
+        return BLOCKED
+    if any(code in str(error) for code in BLOCKED_ERROR_CODES):
+        return BLOCKED
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return RETRYABLE
+    status = error_status(error)
+    if status is not None:
+        return RETRYABLE if status in RETRYABLE_STATUS_CODES or status >= 500 else FATAL
+    if any(n in name for n in RETRYABLE_ERROR_NAMES):
+        return RETRYABLE
+    return FATAL
+
+
+class AttemptLog:
+    """Appends one JSON line per API attempt to `path` (ATTEMPTS.jsonl)."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, **entry):
+        line = json.dumps(
+            {"time": datetime.now().isoformat(timespec="milliseconds"), **entry},
+            default=str,
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Retrier:
+    """Calls a function until it succeeds, fails for good, or runs out of
+    attempts, sleeping with capped exponential backoff between attempts.
+
+    Each delay is half deterministic and half random ("equal jitter"), so
+    workers that failed together do not retry in lockstep, and is never
+    shorter than the provider's Retry-After.
+    """
+
+    def __init__(self, max_attempts=5, base_delay=1.0, max_delay=60.0, attempt_log=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.attempt_log = attempt_log
+        self.retries = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._random = random.Random()
+
+    def backoff(self, attempt, minimum=None):
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = cap / 2 + self._random.uniform(0, cap / 2)
+        return max(delay, minimum or 0.0)
+
+    def call(self, fn, prompt_id, on_error=None):
+        """Return (fn(), number of attempts made). The last error is re-raised
+        once it is not retryable or the attempts are used up; `on_error` sees
+        every error first."""
+        for attempt in range(1, self.max_attempts + 1):
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                elapsed = time.monotonic() - started
+                if on_error is not None:
+                    on_error(e)
+                outcome = classify_error(e)
+                retry = outcome == RETRYABLE and attempt < self.max_attempts
+                delay = self.backoff(attempt, retry_after(e)) if retry else None
+                self._record(prompt_id, attempt, outcome, elapsed, e, delay)
+                with self._lock:
+                    if retry:
+                        self.retries += 1
+                    else:
+                        self.failures += 1
+                if not retry:
+                    raise
+                logging.warning(
+                    f"Attempt {attempt} for prompt {prompt_id} failed ({outcome}): "
+                    f"{str(e)}; retrying in {delay:.1f} seconds"
+                )
+                time.sleep(delay)
+            else:
+                self._record(prompt_id, attempt, "ok", time.monotonic() - started)
+                return result, attempt
+
+    def _record(self, prompt_id, attempt, outcome, elapsed, error=None, retry_in=None):
+        if self.attempt_log is None:
+            return
+        self.attempt_log.record(
+            prompt_id=prompt_id,
+            attempt=attempt,
+            outcome=outcome,
+            elapsed=round(elapsed, 3),
+            status=error_status(error) if error is not None else None,
+            error=f"{type(error).__name__}: {error}" if error is not None else None,
+            retry_in=round(retry_in, 3) if retry_in is not None else None,
+        )
+
+    def summary(self):
+        return f"Retries: {self.retries} attempts retried, {self.failures} prompts failed"
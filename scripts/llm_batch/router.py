@@ -0,0 +1,180 @@
+"""Weighted fan-out of one prompt sheet across several providers.
+
+RouterProvider looks like a single provider to the runner. Each call goes to
+a route picked at random by weight, preferring routes whose own rate budget
+has room right now, so throughput adds up across providers. A route that
+fails with a retryable error (rate limit, overload, timeout) is taken out of
+rotation for a cooldown and the call fails over to the next route.
+Results are merged into one RESULTS.pkl, which is sorted by PROMPT_ID.
+"""
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+from llm_batch.cache import make_cache_key
+from llm_batch.providers.base import Provider
+from llm_batch.ratelimit import RateLimiter, estimate_tokens, retry_after, usage_tokens
+from llm_batch.retry import RETRYABLE, classify_error
+
+
+@dataclass
+class Route:
+    """One provider of a router, with its share of the prompts and its own
+    rate budget."""
+
+    provider: Provider
+    weight: float = 1.0
+    requests_per_minute: float = 50
+    tokens_per_minute: float = None
+    failures: int = field(default=0, init=False)
+    down_until: float = field(default=0.0, init=False)
+
+    def __post_init__(self):
+        self.limiter = RateLimiter(self.requests_per_minute, self.tokens_per_minute)
+
+
+@dataclass
+class RoutedResponse:
+    """A response tagged with the provider that produced it."""
+
+    provider: Provider
+    response: object
+
+
+class RouterProvider(Provider):
+    """Spreads prompts over `routes` by weight and fails over between them.
+
+    A failing route sits out `base_cooldown` seconds, doubled per consecutive
+    failure up to `max_cooldown`, or the provider's Retry-After if longer.
+    """
+
+    name = "Router"
+
+    def __init__(self, routes, base_cooldown=5.0, max_cooldown=300.0, seed=None):
+        first = routes[0].provider
+        super().__init__(first.model, first.max_tokens, first.temperature, first.system_prompt)
+        self.routes = routes
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Picklable for sharded runs; each process gets its own lock
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def requests_per_minute(self):
+        """Combined request budget of all routes."""
+        return sum(route.requests_per_minute for route in self.routes)
+
+    def preload_api_key(self):
+        for route in self.routes:
+            route.provider.preload_api_key()
+
+    def split_rate_budget(self, parts):
+        for route in self.routes:
+            route.requests_per_minute /= parts
+            if route.tokens_per_minute:
+                route.tokens_per_minute /= parts
+            route.limiter = RateLimiter(route.requests_per_minute, route.tokens_per_minute)
+
+    def setup(self):
+        for route in self.routes:
+            route.provider.setup()
+        names = ", ".join(
+            f"{route.provider.name} {route.provider.model} (weight {route.weight})"
+            for route in self.routes
+        )
+        logging.info(f"Routing prompts across: {names}")
+
+    def _ordered_routes(self):
+        """Routes in rotation, in a random order weighted by route weight."""
+        now = time.monotonic()
+        with self._lock:
+            up = [route for route in self.routes if route.down_until <= now]
+            if not up:
+                # Every route is cooling down: try the one that recovers first
+                up = [min(self.routes, key=lambda route: route.down_until)]
+            # Weighted random order (Efraimidis-Spirakis keys)
+            keys = {id(route): self._random.random() ** (1.0 / route.weight) for route in up}
+        return sorted(up, key=lambda route: keys[id(route)], reverse=True)
+
+    def _mark_down(self, route, error):
+        with self._lock:
+            route.failures += 1
+            cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** (route.failures - 1))
+            cooldown = max(cooldown, retry_after(error) or 0.0)
+            route.down_until = time.monotonic() + cooldown
+        logging.warning(
+            f"{route.provider.name} {route.provider.model} failed ({str(error)}); "
+            f"out of rotation for {cooldown:.0f} seconds"
+        )
+
+    def _route(self, call, prompt_text):
+        estimated_tokens = estimate_tokens((self.system_prompt or "") + prompt_text)
+        routes = self._ordered_routes()
+        # Take the first route with budget to spare, or wait for the preferred one
+        chosen = next((r for r in routes if r.limiter.try_acquire(estimated_tokens)), None)
+        if chosen is None:
+            chosen = routes[0]
+            chosen.limiter.acquire(estimated_tokens)
+        candidates = [chosen] + [route for route in routes if route is not chosen]
+        for n, route in enumerate(candidates):
+            if n:
+                route.limiter.acquire(estimated_tokens)
+            try:
+                response, headers, ttfb = call(route.provider)
+            except Exception as e:
+                route.limiter.observe_error(e)
+                if classify_error(e) != RETRYABLE:
+                    raise
+                self._mark_down(route, e)
+                if n == len(candidates) - 1:
+                    raise
+                continue
+            route.limiter.observe_headers(headers)
+            route.limiter.settle(estimated_tokens, usage_tokens(*route.provider.usage(response)))
+            with self._lock:
+                route.failures = 0
+            # Each route consumed its own headers; the runner's limiter gets none
+            return RoutedResponse(route.provider, response), None, ttfb
+
+    def generate(self, prompt_text):
+        return self._route(lambda provider: provider.generate(prompt_text), prompt_text)
+
+    def extract_text(self, response):
+        return response.provider.extract_text(response.response)
+
+    def usage(self, response):
+        return response.provider.usage(response.response)
+
+    def finish_reason(self, response):
+        return response.provider.finish_reason(response.response)
+
+    def response_model(self, response):
+        return response.provider.response_model(response.response)
+
+    def raw_payload(self, response):
+        return {
+            "provider": response.provider.name,
+            "response": response.provider.raw_payload(response.response),
+        }
+
+    def cache_key(self, prompt_text):
+        # Any route may answer, so the key covers the whole route set
+        return make_cache_key(
+            [route.provider.cache_key(prompt_text) for route in self.routes],
+            None,
+            None,
+            None,
+            prompt_text,
+        )
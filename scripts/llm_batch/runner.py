@@ -0,0 +1,686 @@
+"""Provider-agnostic batch runner behind the *-api-template.py scripts."""
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+
+from llm_batch.cache import ResponseCache
+from llm_batch.cli import parse_cli_args
+from llm_batch.dispatch import dispatch
+from llm_batch.journal import (
+    JOURNAL_FILE_NAME,
+    RESULT_FORMATS,
+    merge_results,
+    open_checkpoint,
+    open_response_store,
+    write_results,
+)
+from llm_batch.metrics import MODEL_PRICES, MetricsLog, format_summary, write_summary
+from llm_batch.prompts import PromptSource
+from llm_batch.providers.base import ContentBlockedError
+from llm_batch.ratelimit import RateLimiter, estimate_tokens, usage_tokens
+from llm_batch.retry import AttemptLog, Retrier
+
+LOG_FILE_NAME = "LOG.log"
+PKL_FILE_NAME = "RESULTS.pkl"
+CACHE_FILE_NAME = "RESPONSE_CACHE.sqlite"  # Shared by all runs and templates
+BATCHES_FILE_NAME = "BATCHES.json"
+ATTEMPTS_FILE_NAME = "ATTEMPTS.jsonl"
+METRICS_FILE_NAME = "METRICS.jsonl"
+METRICS_SUMMARY_FILE_NAME = "METRICS_SUMMARY.json"
+RESULT_ID_WIDTH = 4  # Zero-padding of PROMPT_ID in {prefix}_result.txt
+PARTIAL_SUFFIX = ".partial"  # Result file of a response still streaming, or cut off
+SHARD_DIR_FORMAT = "shard_{:02d}"  # Checkpoint directory of one shard (--shards)
+
+
+@dataclass
+class RunConfig:
+    """Prompt sheet layout and throughput settings of one template."""
+
+    prompt_index_column: str = "PROMPT_ID"
+    prompt_column: str = "PROMPT"
+    additional_columns: list = field(default_factory=list)
+    requests_per_minute: float = 50
+    tokens_per_minute: float = None  # None disables token budgeting
+    max_concurrency: int = 4
+    max_attempts: int = 5  # API calls per prompt before it is given up
+    retry_base_delay: float = 1.0  # Backoff after the first failure, doubled per retry
+    retry_max_delay: float = 60.0
+    cache_file_name: str = CACHE_FILE_NAME
+    model_prices: dict = field(default_factory=dict)  # Overrides of metrics.MODEL_PRICES
+    read_chunk_size: int = 1024  # Rows parsed at a time from Parquet and CSV files
+    batch_size: int = 10_000  # Requests per submitted batch (--batch mode)
+    batch_poll_interval: float = 30  # First poll delay in seconds, doubled up to the max
+    batch_max_poll_interval: float = 600
+    # Results files to write: RESULTS.parquet and the legacy RESULTS.pkl
+    result_formats: tuple = RESULT_FORMATS
+
+
+class BatchRunner:
+    """Runs a prompt sheet through one provider and checkpoints the results.
+
+    Result records hold only plain typed fields (see `_response_fields`).
+    With `keep_raw_responses` the full API responses are also kept, as plain
+    data, in the run's compressed RESPONSES.journal. With `stream` responses
+    are written to {prefix}_result.txt.partial chunk by chunk as they arrive.
+    """
+
+    def __init__(
+        self,
+        provider,
+        config,
+        results_dir,
+        use_cache=True,
+        keep_raw_responses=False,
+        stream=False,
+        shard=None,
+    ):
+        self.provider = provider
+        self.config = config
+        self.results_dir = results_dir
+        self.shard = shard
+        self.rate_limiter = RateLimiter(config.requests_per_minute, config.tokens_per_minute)
+        self.cache = ResponseCache(config.cache_file_name, enabled=use_cache)
+        self.keep_raw_responses = keep_raw_responses
+        if stream and not provider.supports_streaming:
+            logging.warning(
+                f"The {provider.name} adapter cannot stream; waiting for whole responses."
+            )
+            stream = False
+        self.stream = stream
+        self.response_store = None
+        self.retrier = Retrier(
+            config.max_attempts,
+            config.retry_base_delay,
+            config.retry_max_delay,
+            attempt_log=AttemptLog(os.path.join(results_dir, ATTEMPTS_FILE_NAME)),
+        )
+        self.metrics = MetricsLog(
+            os.path.join(results_dir, METRICS_FILE_NAME),
+            {**MODEL_PRICES, **config.model_prices},
+        )
+
+    def generate_response(self, prompt_text, prompt_id, enqueued=None):
+        """Generate a response for one prompt and write it to its result file.
+
+        Transient failures are retried with backoff; every attempt is logged
+        to ATTEMPTS.jsonl and every prompt to METRICS.jsonl. `enqueued` is
+        the time.monotonic() at which the prompt was read. Returns (result
+        text, response fields, raw response), or None if the prompt failed.
+        The raw response is None for cache hits.
+        """
+        provider = self.provider
+        cache_key = provider.cache_key(prompt_text)
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            result_content, fields = cached
+            self._write_result_file(prompt_id, result_content)
+            self._record_metrics(prompt_id, "cached", fields)
+            return result_content, {**fields, "ATTEMPTS": 0}, None
+
+        estimated_tokens = estimate_tokens((provider.system_prompt or "") + prompt_text)
+        timings = {}
+        attempts = 0
+
+        def attempt():
+            nonlocal attempts
+            self.rate_limiter.acquire(estimated_tokens)
+            attempts += 1
+            if attempts == 1 and enqueued is not None:
+                timings["queue_wait"] = time.monotonic() - enqueued
+            started = time.perf_counter()
+            if self.stream:
+                response, headers, timings["ttfb"] = self._stream_response(
+                    prompt_text, prompt_id, timings
+                )
+            else:
+                response, headers, timings["ttfb"] = provider.generate(prompt_text)
+            fields = self._response_fields(response, time.perf_counter() - started)
+            self.rate_limiter.observe_headers(headers)
+            # Without reported usage the estimate stands
+            self.rate_limiter.settle(
+                estimated_tokens, usage_tokens(fields["INPUT_TOKENS"], fields["OUTPUT_TOKENS"])
+            )
+            return provider.extract_text(response), fields, response
+
+        try:
+            (result_content, fields, response), attempts = self.retrier.call(
+                attempt, prompt_id, on_error=self.rate_limiter.observe_error
+            )
+            self._write_result_file(prompt_id, result_content)
+            self._cache_put(cache_key, result_content, fields)
+            if self.stream:
+                os.remove(self._result_path(prompt_id) + PARTIAL_SUFFIX)
+            self._record_metrics(prompt_id, "ok", fields, attempts, **timings)
+            return result_content, {**fields, "ATTEMPTS": attempts}, response
+        except Exception as e:
+            logging.error(f"Error generating response for prompt {prompt_id}: {str(e)}")
+            self.metrics.record(prompt_id, "failed", provider.model, attempts=attempts)
+            return None
+
+    def _stream_response(self, prompt_text, prompt_id, timings):
+        """Stream one response into {prefix}_result.txt.partial, flushing each
+        chunk, so a response cut off partway still leaves its text on disk.
+        Records the time to the first text chunk as timings["ttft"]."""
+        partial_path = self._result_path(prompt_id) + PARTIAL_SUFFIX
+        timings.pop("ttft", None)
+        started = time.perf_counter()
+        with open(partial_path, "w", encoding="utf-8") as f:
+
+            def on_text(text):
+                if "ttft" not in timings:
+                    timings["ttft"] = time.perf_counter() - started
+                f.write(text)
+                f.flush()
+
+            return self.provider.stream(prompt_text, on_text)
+
+    def _record_metrics(self, prompt_id, outcome, fields, attempts=None, **timings):
+        self.metrics.record(
+            prompt_id,
+            outcome,
+            fields.get("MODEL"),
+            fields.get("INPUT_TOKENS"),
+            fields.get("OUTPUT_TOKENS"),
+            attempts,
+            latency=fields.get("LATENCY") if outcome == "ok" else None,
+            **timings,
+        )
+
+    def _response_fields(self, response, latency=None):
+        """The typed per-response columns of the results files. `latency` is the
+        seconds the API call took; batch results have none."""
+        provider = self.provider
+        input_tokens, output_tokens = provider.usage(response)
+        return {
+            "INPUT_TOKENS": input_tokens,
+            "OUTPUT_TOKENS": output_tokens,
+            "LATENCY": latency,
+            "FINISH_REASON": provider.finish_reason(response),
+            "MODEL": provider.response_model(response),
+        }
+
+    def _cache_put(self, cache_key, result_content, fields):
+        """Cache a response. The response is already paid for and saved, so a
+        failed write (a locked cache shared by shards, a full disk) only logs."""
+        try:
+            self.cache.put(cache_key, result_content, fields)
+        except Exception as e:
+            logging.warning(f"Could not cache response: {str(e)}")
+
+    def _cache_lookup(self, cache_key):
+        """Return the cached (result text, response fields) for a key, or None."""
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return None
+        result_content, fields = cached
+        if not isinstance(fields, dict):
+            # Entries cached before lean records hold the SDK response itself
+            fields = self._response_fields(fields) if fields is not None else {}
+        return result_content, fields
+
+    def _result_path(self, prompt_id):
+        prefix = str(prompt_id).zfill(RESULT_ID_WIDTH)
+        return os.path.join(self.results_dir, f"{prefix}_result.txt")
+
+    def _write_result_file(self, prompt_id, result_content):
+        with open(self._result_path(prompt_id), "w", encoding="utf-8") as f:
+            f.write(result_content)
+
+    def _open_prompts(self, path_to_prompts):
+        """Open the prompt file as a lazy source of (PROMPT_ID, prompt, *extra
+        values) tuples, or return None if the file is unusable.
+
+        The additional column values travel with each prompt so saving a
+        result needs no per-prompt lookup in the input.
+        """
+        config = self.config
+        try:
+            source = PromptSource(
+                path_to_prompts,
+                config.prompt_index_column,
+                config.prompt_column,
+                config.additional_columns,
+                chunk_size=config.read_chunk_size,
+                shard=self.shard,
+            )
+            logging.info(f"Columns in the input file: {source.columns}")
+            print(f"Columns in the input file: {source.columns}")
+        except FileNotFoundError:
+            logging.error(f"Input file {path_to_prompts} not found.")
+            return None
+        except KeyError as e:
+            logging.error(f"Column error: {str(e)}")
+            return None
+        except Exception as e:
+            logging.error(f"Error reading input file: {str(e)}")
+            return None
+        return source
+
+    def _open_checkpoint(self):
+        results_list, journal = open_checkpoint(self.results_dir)
+        completed_ids = {item["PROMPT_ID"] for item in results_list}
+        if self.keep_raw_responses:
+            self.response_store = open_response_store(self.results_dir)
+        if completed_ids:
+            logging.info(
+                f"Resuming {self.results_dir}: {len(completed_ids)} prompts already completed"
+            )
+        return results_list, journal, completed_ids
+
+    def _save_result(self, results_list, journal, completed_ids, index, record, response):
+        results_list.append(record)
+        completed_ids.add(record["PROMPT_ID"])
+        try:
+            journal.append(record)
+            if self.response_store is not None and response is not None:
+                self.response_store.append(
+                    {
+                        "PROMPT_ID": record["PROMPT_ID"],
+                        "RESPONSE": self.provider.raw_payload(response),
+                    }
+                )
+            logging.info(f"Intermediate results saved for prompt {index}")
+        except Exception as e:
+            logging.error(f"Error saving intermediate results: {str(e)}")
+            print(f"Error saving intermediate results: {str(e)}")
+
+    def _finish(self, results_list, journal, total_prompts_count):
+        journal.close()
+        if self.response_store is not None:
+            self.response_store.close()
+        self.retrier.attempt_log.close()
+        summary = self.metrics.summary()
+        self.metrics.close()
+        write_summary(summary, os.path.join(self.results_dir, METRICS_SUMMARY_FILE_NAME))
+        write_results(
+            results_list,
+            os.path.join(self.results_dir, PKL_FILE_NAME),
+            formats=self.config.result_formats,
+        )
+
+        logging.info(
+            f"Processing complete. {len(results_list)} out of {total_prompts_count} prompts processed successfully."
+        )
+        logging.info(f"Results saved to {self.results_dir}")
+        logging.info(self.cache.summary())
+        logging.info(self.retrier.summary())
+        print(
+            f"Processing complete. {len(results_list)} out of {total_prompts_count} prompts processed successfully."
+        )
+        print(f"Results saved to {self.results_dir}")
+        print(self.cache.summary())
+        print(self.retrier.summary())
+        self.cache.close()
+        for line in format_summary(summary):
+            logging.info(line)
+            print(line)
+
+    def process_prompts(self, path_to_prompts):
+        """Process prompts and generate responses.
+
+        Prompts are streamed from the input file as the dispatcher asks for
+        them, so requests start before the file has been read to the end.
+        """
+        config = self.config
+        source = self._open_prompts(path_to_prompts)
+        if source is None:
+            return
+        extra_columns = source.extra_columns
+        results_list, journal, completed_ids = self._open_checkpoint()
+        total_label = source.total if source.total is not None else "?"
+        rows_read = 0
+
+        def pending_prompts():
+            nonlocal rows_read
+            for index, (prompt_id, prompt_text, *extras) in enumerate(source, 1):
+                rows_read = index
+                # Check if this prompt has already been processed
+                if prompt_id in completed_ids:
+                    logging.info(
+                        f"Skipping prompt {index} (ID: {prompt_id}) as it's already processed."
+                    )
+                    continue
+                yield index, prompt_id, prompt_text, extras, time.monotonic()
+
+        def run_prompt(job):
+            index, prompt_id, prompt_text, _, enqueued = job
+            logging.info(f"Processing prompt {index} of {total_label}")
+            print(f"Processing prompt {index} of {total_label}")
+            return self.generate_response(prompt_text, prompt_id, enqueued)
+
+        def save_result(job, result):
+            index, prompt_id, _, extras, _ = job
+            result_content, fields, response = result or (None, None, None)
+            if not result_content:
+                return
+            result_dict = {"PROMPT_ID": prompt_id, "RESULT": result_content, **fields}
+            # Add additional columns
+            result_dict.update(zip(extra_columns, extras))
+            self._save_result(
+                results_list, journal, completed_ids, index, result_dict, response
+            )
+
+        # Up to max_concurrency requests in flight, paced by the rate limiter
+        try:
+            dispatch(
+                pending_prompts(),
+                run_prompt,
+                save_result,
+                max_in_flight=config.max_concurrency,
+            )
+        finally:
+            self._finish(results_list, journal, source.total or rows_read)
+
+    def process_batch(self, path_to_prompts):
+        """Process prompts through the provider's asynchronous batch API.
+
+        Cached prompts are answered locally; the rest are submitted in chunks
+        of `batch_size` while the input file is streamed. Submitted batch IDs
+        and their requests' custom_ids are kept in BATCHES.json, so --resume
+        polls the existing batches instead of paying for them twice and
+        submits only the prompts that are in none of them.
+        """
+        provider = self.provider
+        if not provider.supports_batch:
+            logging.error(f"The {provider.name} adapter does not support --batch mode.")
+            print(f"The {provider.name} adapter does not support --batch mode.")
+            return
+        source = self._open_prompts(path_to_prompts)
+        if source is None:
+            return
+        extra_columns = source.extra_columns
+        results_list, journal, completed_ids = self._open_checkpoint()
+        rows_read = 0
+        # Pending rows by custom_id, the 1-based row of the prompt file;
+        # PROMPT_IDs may not satisfy the providers' custom_id format
+        rows = {}
+
+        def save(custom_id, result_content, fields, response=None):
+            index, (prompt_id, _, *extras) = rows.pop(custom_id)
+            self._write_result_file(prompt_id, result_content)
+            result_dict = {"PROMPT_ID": prompt_id, "RESULT": result_content, **fields}
+            result_dict.update(zip(extra_columns, extras))
+            self._save_result(
+                results_list, journal, completed_ids, index, result_dict, response
+            )
+
+        try:
+            tracker = BatchTracker(os.path.join(self.results_dir, BATCHES_FILE_NAME))
+            # Rows already in a submitted, uncollected batch are only collected
+            in_flight = tracker.in_flight_ids()
+            if in_flight is None:
+                logging.warning(
+                    f"{BATCHES_FILE_NAME} predates per-batch request IDs; collecting its "
+                    "pending batches without submitting the remaining prompts"
+                )
+            requests, custom_ids = [], []
+            for index, row in enumerate(source, 1):
+                rows_read = index
+                prompt_id, prompt_text = row[:2]
+                if prompt_id in completed_ids:
+                    continue
+                custom_id = f"row-{index}"
+                rows[custom_id] = (index, row)
+                if in_flight is None or custom_id in in_flight:
+                    continue
+                cached = self._cache_lookup(provider.cache_key(prompt_text))
+                if cached is not None:
+                    self._record_metrics(prompt_id, "cached", cached[1])
+                    save(custom_id, *cached)
+                    continue
+                requests.append(provider.batch_request(custom_id, prompt_text))
+                custom_ids.append(custom_id)
+                if len(requests) == self.config.batch_size:
+                    self._submit_batch(tracker, requests, custom_ids)
+                    requests, custom_ids = [], []
+            if requests:
+                self._submit_batch(tracker, requests, custom_ids)
+
+            for batch_id in tracker.pending():
+                self._wait_for_batch(batch_id)
+                for custom_id, response, error in provider.batch_results(batch_id):
+                    if custom_id not in rows:
+                        # Already saved by an earlier attempt at collecting it
+                        continue
+                    prompt_id, prompt_text = rows[custom_id][1][:2]
+                    if error is None:
+                        try:
+                            result_content = provider.extract_text(response)
+                        except ContentBlockedError as e:
+                            error = e
+                    if error is not None:
+                        logging.error(f"Batch request for prompt {prompt_id} failed: {error}")
+                        self.metrics.record(prompt_id, "failed", provider.model, batch=True)
+                        continue
+                    fields = self._response_fields(response)
+                    self.metrics.record(
+                        prompt_id,
+                        "ok",
+                        fields["MODEL"],
+                        fields["INPUT_TOKENS"],
+                        fields["OUTPUT_TOKENS"],
+                        batch=True,
+                    )
+                    save(custom_id, result_content, fields, response)
+                    self._cache_put(provider.cache_key(prompt_text), result_content, fields)
+                tracker.mark_collected(batch_id)
+        finally:
+            self._finish(results_list, journal, source.total or rows_read)
+
+    def _submit_batch(self, tracker, requests, custom_ids):
+        batch_id = self.provider.submit_batch(requests)
+        tracker.add(batch_id, custom_ids)
+        logging.info(f"Submitted batch {batch_id} with {len(requests)} requests")
+        print(f"Submitted batch {batch_id} with {len(requests)} requests")
+
+    def _wait_for_batch(self, batch_id):
+        """Poll a batch with exponential backoff until the provider finishes it."""
+        interval = self.config.batch_poll_interval
+        while not self.provider.batch_done(batch_id):
+            logging.info(f"Batch {batch_id} still running; next check in {interval:.0f} seconds")
+            time.sleep(interval)
+            interval = min(interval * 2, self.config.batch_max_poll_interval)
+
+
+class BatchTracker:
+    """BATCHES.json: the batches submitted for a run, the custom_ids of
+    their requests and which were collected."""
+
+    def __init__(self, path):
+        self.path = path
+        self.batches = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.batches = json.load(f)
+        for batch_id, batch in self.batches.items():
+            if isinstance(batch, bool):
+                # Written before the custom_ids were recorded
+                self.batches[batch_id] = {"collected": batch, "custom_ids": None}
+
+    def add(self, batch_id, custom_ids):
+        self.batches[batch_id] = {"collected": False, "custom_ids": list(custom_ids)}
+        self._save()
+
+    def pending(self):
+        return [batch_id for batch_id, batch in self.batches.items() if not batch["collected"]]
+
+    def in_flight_ids(self):
+        """custom_ids of the requests in pending batches, or None if a pending
+        batch did not record them."""
+        in_flight = set()
+        for batch_id in self.pending():
+            custom_ids = self.batches[batch_id]["custom_ids"]
+            if custom_ids is None:
+                return None
+            in_flight.update(custom_ids)
+        return in_flight
+
+    def mark_collected(self, batch_id):
+        self.batches[batch_id]["collected"] = True
+        self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.batches, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def setup_logging(results_dir):
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler(os.path.join(results_dir, LOG_FILE_NAME)),
+            logging.StreamHandler(),
+        ],
+    )
+
+
+def check_shard_count(results_dir, shard_count):
+    """Refuse to resume a run with a different number of shards, which would
+    assign prompts to other shards and redo or duplicate them."""
+    existing = len(glob.glob(os.path.join(results_dir, "shard_*")))
+    if existing and existing != shard_count:
+        raise ValueError(
+            f"{results_dir} was run with {existing} shards; resume it with --shards {existing}"
+        )
+
+
+def _run_shard(provider, config, results_dir, path_to_prompts, shard, batch, options):
+    """Worker process of a sharded run: one shard through its own runner."""
+    setup_logging(results_dir)
+    try:
+        provider.setup()
+        runner = BatchRunner(provider, config, results_dir, shard=shard, **options)
+        if batch:
+            runner.process_batch(path_to_prompts)
+        else:
+            runner.process_prompts(path_to_prompts)
+    except Exception as e:
+        logging.exception(f"An unexpected error occurred: {str(e)}")
+        raise
+
+
+def run_sharded(
+    provider, config, results_dir, path_to_prompts, shard_count, batch=False, **options
+):
+    """Split the prompt file into `shard_count` shards by PROMPT_ID hash and
+    run each in its own process, checkpointing to its own shard_NN directory.
+
+    The shards' results, each sorted by PROMPT_ID, are k-way merged into the
+    run's results files, also when the run is interrupted. The rate budget is
+    divided evenly between the processes.
+    """
+    check_shard_count(results_dir, shard_count)
+    shard_dirs = [
+        os.path.join(results_dir, SHARD_DIR_FORMAT.format(n)) for n in range(shard_count)
+    ]
+    for shard_dir in shard_dirs:
+        os.makedirs(shard_dir, exist_ok=True)
+
+    # Ask for any missing API key here, once, rather than in every worker
+    provider.preload_api_key()
+    provider.split_rate_budget(shard_count)
+    shard_config = replace(
+        config,
+        requests_per_minute=config.requests_per_minute / shard_count,
+        tokens_per_minute=(
+            config.tokens_per_minute / shard_count if config.tokens_per_minute else None
+        ),
+    )
+    logging.info(f"Running {path_to_prompts} as {shard_count} shards in {results_dir}")
+    try:
+        # "spawn" gives every worker fresh logging and SDK clients on all platforms
+        with ProcessPoolExecutor(
+            shard_count, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _run_shard,
+                    provider,
+                    shard_config,
+                    shard_dir,
+                    path_to_prompts,
+                    (n, shard_count),
+                    batch,
+                    options,
+                )
+                for n, shard_dir in enumerate(shard_dirs)
+            ]
+            for future in futures:
+                future.result()
+    finally:
+        shard_results = [
+            os.path.join(shard_dir, PKL_FILE_NAME)
+            for shard_dir in shard_dirs
+            if os.path.exists(os.path.join(shard_dir, JOURNAL_FILE_NAME))
+        ]
+        if shard_results:
+            merge_results(
+                shard_results,
+                os.path.join(results_dir, PKL_FILE_NAME),
+                formats=config.result_formats,
+            )
+            logging.info(f"Merged {len(shard_results)} shard results into {results_dir}")
+            print(f"Merged shard results into {results_dir}")
+
+
+def main(provider, config):
+    """Command-line entry point shared by the template scripts."""
+    args = parse_cli_args(
+        f"Generate responses for a prompt sheet with the {provider.name} API."
+    )
+
+    # Time-stamped output directory, or the directory of the run being resumed
+    time_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results_dir = args.resume or f"results_{time_stamp}"
+    os.makedirs(results_dir, exist_ok=True)
+    setup_logging(results_dir)
+
+    try:
+        path_to_prompts = args.prompts or input(
+            "Enter the path to the prompt file (.pkl, .parquet, .jsonl, .csv): "
+        ).strip()
+        if args.base_url:
+            provider.base_url = args.base_url
+        if args.shards > 1:
+            run_sharded(
+                provider,
+                config,
+                results_dir,
+                path_to_prompts,
+                args.shards,
+                batch=args.batch,
+                use_cache=not args.no_cache,
+                keep_raw_responses=args.raw_responses,
+                stream=args.stream,
+            )
+            return
+        check_shard_count(results_dir, 1)
+        provider.setup()
+        runner = BatchRunner(
+            provider,
+            config,
+            results_dir,
+            use_cache=not args.no_cache,
+            keep_raw_responses=args.raw_responses,
+            stream=args.stream,
+        )
+        if args.batch:
+            runner.process_batch(path_to_prompts)
+        else:
+            runner.process_prompts(path_to_prompts)
+    except Exception as e:
+        logging.exception(f"An unexpected error occurred: {str(e)}")
+        print(
+            f"An unexpected error occurred. Please check the log file in {results_dir} for details."
+        )
+        sys.exit(1)
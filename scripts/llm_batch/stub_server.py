@@ -0,0 +1,376 @@
+"""Local stand-in for the Anthropic and OpenAI batch endpoints.
+
+Answers every request by echoing the prompt, so --batch mode can be run end
+to end without network access or cost:
+
+    python -m llm_batch.stub_server --port 8765 --delay 5
+    python BETA_claude-api-template.py --batch \
+        --base-url http://127.0.0.1:8765 PROMPTS.pkl
+
+The OpenAI templates need the /v1 suffix: --base-url http://127.0.0.1:8765/v1.
+Batches report "in progress" until `--delay` seconds after submission.
+Requests with "stream": true are answered word by word as server-sent
+events. Only the endpoints used by the adapters are implemented.
+"""
+import argparse
+import itertools
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_batches = {}
+_files = {}
+
+
+def _new_id(prefix):
+    with _lock:
+        return f"{prefix}_{next(_ids):06d}"
+
+
+def _iso(timestamp):
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(timestamp))
+
+
+def _echo(messages):
+    prompt = next(
+        (m["content"] for m in reversed(messages) if m.get("role") == "user"), ""
+    )
+    text = f"Response to: {prompt}"
+    return text, max(1, len(prompt) // 4), max(1, len(text) // 4)
+
+
+def anthropic_message(params):
+    text, input_tokens, output_tokens = _echo(params.get("messages", []))
+    return {
+        "id": _new_id("msg"),
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "stub"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+    }
+
+
+def anthropic_events(params):
+    message = anthropic_message(params)
+    text = message["content"][0]["text"]
+    yield "message_start", {
+        "type": "message_start",
+        "message": {
+            **message,
+            "content": [],
+            "stop_reason": None,
+            "usage": {**message["usage"], "output_tokens": 0},
+        },
+    }
+    yield "content_block_start", {
+        "type": "content_block_start",
+        "index": 0,
+        "content_block": {"type": "text", "text": ""},
+    }
+    for word in re.split(r"(?<= )", text):
+        yield "content_block_delta", {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "text_delta", "text": word},
+        }
+    yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+    yield "message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+        "usage": {"output_tokens": message["usage"]["output_tokens"]},
+    }
+    yield "message_stop", {"type": "message_stop"}
+
+
+def openai_completion(params):
+    text, input_tokens, output_tokens = _echo(params.get("messages", []))
+    return {
+        "id": _new_id("chatcmpl"),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": params.get("model", "stub"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def openai_chunks(params):
+    completion = openai_completion(params)
+    chunk = {key: completion[key] for key in ("id", "created", "model")}
+    chunk["object"] = "chat.completion.chunk"
+    text = completion["choices"][0]["message"]["content"]
+    for word in re.split(r"(?<= )", text):
+        choice = {
+            "index": 0,
+            "delta": {"role": "assistant", "content": word},
+            "finish_reason": None,
+        }
+        yield None, {**chunk, "choices": [choice]}
+    choice = {"index": 0, "delta": {}, "finish_reason": "stop"}
+    yield None, {**chunk, "choices": [choice]}
+    yield None, {**chunk, "choices": [], "usage": completion["usage"]}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    chunk_delay = 0.01  # Seconds between streamed events
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, status=200, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_events(self, events, done_marker=False):
+        """Stream (event name, data) pairs as server-sent events."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for event, data in events:
+            if event is not None:
+                self.wfile.write(f"event: {event}\n".encode("utf-8"))
+            self.wfile.write(f"data: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(self.chunk_delay)
+        if done_marker:
+            self.wfile.write(b"data: [DONE]\n\n")
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _not_found(self):
+        self._send({"error": {"type": "not_found_error", "message": self.path}}, 404)
+
+    def _base_url(self):
+        return f"http://{self.headers.get('Host')}"
+
+    # Anthropic message batches
+
+    def _anthropic_batch(self, batch):
+        done = time.time() >= batch["ready_at"]
+        count = len(batch["requests"])
+        return {
+            "id": batch["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if done else "in_progress",
+            "request_counts": {
+                "processing": 0 if done else count,
+                "succeeded": count if done else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": _iso(batch["created_at"]),
+            "expires_at": _iso(batch["created_at"] + 86400),
+            "ended_at": _iso(batch["ready_at"]) if done else None,
+            "cancel_initiated_at": None,
+            "archived_at": None,
+            "results_url": (
+                f"{self._base_url()}/v1/messages/batches/{batch['id']}/results"
+                if done
+                else None
+            ),
+        }
+
+    # OpenAI batches
+
+    def _openai_batch(self, batch):
+        done = time.time() >= batch["ready_at"]
+        if done and batch["output_file_id"] is None:
+            lines = []
+            for request in batch["requests"]:
+                lines.append(
+                    json.dumps(
+                        {
+                            "id": _new_id("batch_req"),
+                            "custom_id": request["custom_id"],
+                            "response": {
+                                "status_code": 200,
+                                "request_id": _new_id("req"),
+                                "body": openai_completion(request["body"]),
+                            },
+                            "error": None,
+                        }
+                    )
+                )
+            output = "\n".join(lines).encode("utf-8")
+            batch["output_file_id"] = self._store_file(output)
+        count = len(batch["requests"])
+        return {
+            "id": batch["id"],
+            "object": "batch",
+            "endpoint": batch["endpoint"],
+            "errors": None,
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "status": "completed" if done else "in_progress",
+            "output_file_id": batch["output_file_id"],
+            "error_file_id": None,
+            "created_at": int(batch["created_at"]),
+            "completed_at": int(batch["ready_at"]) if done else None,
+            "request_counts": {
+                "total": count,
+                "completed": count if done else 0,
+                "failed": 0,
+            },
+        }
+
+    def _store_file(self, content, filename="output.jsonl", purpose="batch_output"):
+        file_id = _new_id("file")
+        _files[file_id] = {"content": content, "filename": filename, "purpose": purpose}
+        return file_id
+
+    def _upload_file(self):
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("utf-8")
+            + self._body()
+        )
+        fields = {
+            part.get_param("name", header="content-disposition"): part
+            for part in message.iter_parts()
+        }
+        upload = fields["file"]
+        purpose = "batch"
+        if "purpose" in fields:
+            purpose = fields["purpose"].get_content().strip()
+        content = upload.get_payload(decode=True)
+        filename = upload.get_filename() or "upload.jsonl"
+        file_id = self._store_file(content, filename, purpose)
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(content),
+            "created_at": int(time.time()),
+            "filename": _files[file_id]["filename"],
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/v1/models":
+            model = {"id": "stub", "object": "model", "created": 0, "owned_by": "stub"}
+            return self._send({"object": "list", "data": [model]})
+        match = re.fullmatch(r"/v1/messages/batches/([\w-]+)(/results)?", path)
+        if match and match.group(1) in _batches:
+            batch = _batches[match.group(1)]
+            if not match.group(2):
+                return self._send(self._anthropic_batch(batch))
+            lines = [
+                json.dumps(
+                    {
+                        "custom_id": request["custom_id"],
+                        "result": {
+                            "type": "succeeded",
+                            "message": anthropic_message(request["params"]),
+                        },
+                    }
+                )
+                for request in batch["requests"]
+            ]
+            return self._send(
+                "\n".join(lines).encode("utf-8"), content_type="application/x-jsonl"
+            )
+        match = re.fullmatch(r"/v1/batches/([\w-]+)", path)
+        if match and match.group(1) in _batches:
+            return self._send(self._openai_batch(_batches[match.group(1)]))
+        match = re.fullmatch(r"/v1/files/([\w-]+)/content", path)
+        if match and match.group(1) in _files:
+            content = _files[match.group(1)]["content"]
+            return self._send(content, content_type="application/octet-stream")
+        self._not_found()
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        if path == "/v1/files":
+            return self._send(self._upload_file())
+        params = json.loads(self._body() or b"{}")
+        now = time.time()
+        if path == "/v1/messages":
+            if params.get("stream"):
+                return self._send_events(anthropic_events(params))
+            return self._send(anthropic_message(params))
+        if path == "/v1/chat/completions":
+            if params.get("stream"):
+                return self._send_events(openai_chunks(params), done_marker=True)
+            return self._send(openai_completion(params))
+        if path == "/v1/messages/batches":
+            batch_id = _new_id("msgbatch")
+            _batches[batch_id] = {
+                "id": batch_id,
+                "requests": params["requests"],
+                "created_at": now,
+                "ready_at": now + self.delay,
+            }
+            return self._send(self._anthropic_batch(_batches[batch_id]))
+        if path == "/v1/batches":
+            input_file = _files[params["input_file_id"]]["content"].decode("utf-8")
+            requests = [json.loads(line) for line in input_file.splitlines() if line]
+            batch_id = _new_id("batch")
+            _batches[batch_id] = {
+                "id": batch_id,
+                "requests": requests,
+                "endpoint": params["endpoint"],
+                "input_file_id": params["input_file_id"],
+                "output_file_id": None,
+                "created_at": now,
+                "ready_at": now + self.delay,
+            }
+            return self._send(self._openai_batch(_batches[batch_id]))
+        self._not_found()
+
+
+def serve(host="127.0.0.1", port=8765, delay=0.0):
+    """Start the stub server in a background thread; returns the server."""
+    StubHandler.delay = delay
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the provider batch APIs."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument(
+        "--delay", type=float, default=0.0, help="Seconds each batch stays in progress"
+    )
+    args = parser.parse_args()
+    server = serve(args.host, args.port, args.delay)
+    print(f"Stub batch server listening on http://{args.host}:{args.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+# load_snippets.py
+
+"""Load a snippets tree straight into the local SQLite challenge table.
+
+Writes the rows `LocalImportRunner.importFile` (packages/back-nest/src/
+challenges/commands/local-import-runner.ts) would write for each PATTERN
+block, under the same "Local/Practice" project, but with one `executemany`
+in a single WAL-mode transaction instead of one TypeORM upsert per file.
+Files are read and split in a process pool.
+
+Files without PATTERN markers go through tree-sitter in the importer; they
+are left for `npm run reimport`.
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from validate_snippets import (
+    DEFAULT_CONFIG_PATH,
+    PATTERN_FILE_RE,
+    check_block,
+    get_formatted_text,
+    load_filters,
+    scan_snippets,
+    split_pattern_blocks,
+)
+
+DEFAULT_DB_PATH = DEFAULT_CONFIG_PATH.parent / "speedtyper-local.db"
+
+# LocalImportRunner.ensureProject
+PROJECT_ROW = {
+    "id": "local-practice",
+    "fullName": "Local/Practice",
+    "htmlUrl": "http://localhost:3001",
+    "language": "multi",
+    "stars": 0,
+    "licenseName": "MIT",
+    "ownerAvatar": "",
+    "defaultBranch": "main",
+}
+# LocalImportRunner.mapExtensionToDisplayLanguage
+DISPLAY_LANGUAGES = {
+    "js": "javascript",
+    "jsx": "javascript",
+    "ts": "typescript",
+    "tsx": "typescript",
+    "py": "python",
+    "java": "java",
+    "go": "go",
+    "rs": "rust",
+    "c": "c",
+    "cpp": "cpp",
+    "cs": "csharp",
+}
+
+CHALLENGE_COLUMNS = ("id", "sha", "treeSha", "language", "path", "url", "content", "projectId")
+# ChallengeService.upsert: conflictPaths ['content'], skipUpdateIfNoValuesChanged
+UPSERT_SQL = (
+    "INSERT INTO challenge ("
+    + ", ".join(f'"{c}"' for c in CHALLENGE_COLUMNS)
+    + ") VALUES ("
+    + ", ".join("?" for _ in CHALLENGE_COLUMNS)
+    + ") "
+    'ON CONFLICT ("content") DO UPDATE SET '
+    + ", ".join(f'"{c}" = excluded."{c}"' for c in CHALLENGE_COLUMNS if c != "content")
+    + " WHERE "
+    + " OR ".join(f'challenge."{c}" IS NOT excluded."{c}"' for c in CHALLENGE_COLUMNS)
+)
+
+# (id, sha, treeSha, language, path, url, content); projectId is added on insert
+ChallengeRow = Tuple[str, str, str, str, str, str, str]
+
+
+def challenge_rows(job: Tuple[Path, Path, Dict[str, int]]) -> Optional[List[ChallengeRow]]:
+    """The challenge rows of one file, or None if it has no PATTERN markers."""
+    path, root, filters = job
+    content = path.read_text(encoding="utf-8", errors="replace")
+    if not PATTERN_FILE_RE.search(content.replace("\r\n", "\n").replace("\r", "\n")):
+        return None
+    relative_path = path.relative_to(root).as_posix()
+    extension = path.suffix.lstrip(".")
+    language = DISPLAY_LANGUAGES.get(extension, extension)
+    blocks = [
+        text for _, _, text in split_pattern_blocks(content) if not check_block(text, filters)
+    ]
+    rows = []
+    for i, text in enumerate(blocks):
+        formatted = get_formatted_text(text)
+        content_hash = hashlib.sha256(
+            f"{relative_path}{i}{formatted}".encode("utf-8")
+        ).hexdigest()[:16]
+        rows.append(
+            (
+                f"local-{content_hash}",
+                f"sha-{content_hash}",
+                f"tree-{content_hash}",
+                language,
+                f"{relative_path}#snippet-{i + 1}",
+                f"http://localhost:3001/snippets/{relative_path}#{i + 1}",
+                formatted,
+            )
+        )
+    return rows
+
+
+def ensure_project(connection: sqlite3.Connection) -> str:
+    """Id of the Local/Practice project, created as the importer would."""
+    row = connection.execute(
+        'SELECT "id" FROM project WHERE "fullName" = ?', (PROJECT_ROW["fullName"],)
+    ).fetchone()
+    if row:
+        return row[0]
+    print('📂 Creating "Local/Practice" project...')
+    columns = ", ".join(f'"{column}"' for column in PROJECT_ROW)
+    placeholders = ", ".join("?" for _ in PROJECT_ROW)
+    connection.execute(
+        f"INSERT INTO project ({columns}) VALUES ({placeholders})", tuple(PROJECT_ROW.values())
+    )
+    return PROJECT_ROW["id"]
+
+
+def main():
+    """Main function to bulk-load snippets into the database."""
+    parser = argparse.ArgumentParser(
+        description="Load PATTERN snippets into speedtyper-local.db in one transaction."
+    )
+    parser.add_argument(
+        "snippets_dir",
+        type=Path,
+        help="The snippets root to load (e.g., 'speedtyper-solo/snippets/').",
+    )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        default=DEFAULT_DB_PATH,
+        help="SQLite database to load into (default: the back-nest one).",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CONFIG_PATH,
+        help="parser.config.json whose filters decide which blocks are loaded.",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Reader processes (default: one per CPU)."
+    )
+    args = parser.parse_args()
+
+    if not args.db.is_file():
+        # The schema is created by the backend (TypeORM synchronize)
+        print(f"Error: database '{args.db}' not found. Start the backend once to create it.")
+        return 1
+
+    started = time.perf_counter()
+    filters = load_filters(args.config)
+    files = scan_snippets(args.snippets_dir)
+    print(f"✓ Found {len(files)} file(s) to process\n")
+
+    connection = sqlite3.connect(args.db, isolation_level=None)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    stored_urls = dict(
+        connection.execute('SELECT "url", "content" FROM challenge WHERE "id" LIKE \'local-%\'')
+    )
+
+    rows: List[ChallengeRow] = []
+    loaded_files = skipped_files = failed_files = unchecked_files = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        jobs = ((path, args.snippets_dir, filters) for path in files)
+        for path, file_rows in zip(files, pool.map(challenge_rows, jobs, chunksize=64)):
+            relative_path = path.relative_to(args.snippets_dir).as_posix()
+            if file_rows is None:
+                unchecked_files += 1
+                print(f"  ⊘ {relative_path} - No PATTERN markers (tree-sitter mode, use reimport)")
+            elif not file_rows:
+                skipped_files += 1
+                print(f"  ⊘ {relative_path} - No valid snippets")
+            elif any(stored_urls.get(row[5], row[6]) != row[6] for row in file_rows):
+                # An edited file keeps its URLs; the importer's upsert fails on them too
+                failed_files += 1
+                print(f"  ✗ {relative_path} - ERROR: UNIQUE constraint failed: challenge.url")
+            else:
+                loaded_files += 1
+                rows.extend(file_rows)
+
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        project_id = ensure_project(connection)
+        connection.executemany(UPSERT_SQL, (row + (project_id,) for row in rows))
+        connection.execute("COMMIT")
+    except sqlite3.Error as e:
+        connection.execute("ROLLBACK")
+        print(f"\n❌ Load failed, nothing was written: {e}")
+        return 1
+    finally:
+        connection.close()
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"\nLoaded {len(rows)} snippet(s) from {loaded_files} file(s) in {elapsed_ms:.0f} ms")
+    if skipped_files:
+        print(f"⊘  Skipped: {skipped_files} file(s) had no valid snippets")
+    if unchecked_files:
+        print(f"⊘  Not loaded: {unchecked_files} file(s) without PATTERN markers")
+    if failed_files:
+        print(f"❌ Errors: {failed_files} file(s) conflict with stored snippets")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,15 +1,44 @@
 # populate_snippets.py
 
 import argparse
+import hashlib
+import json
+import os
 import textwrap
 from pathlib import Path
-from typing import Dict, List, TypedDict
+from typing import Dict, Iterator, List, Optional, Set, Tuple, TypedDict
+
+# Kept in the output directory; paths are relative to it, like the
+# importer's `relativePath`.
+MANIFEST_FILE_NAME = ".snippets-manifest.json"
+CHANGED_FILE_NAME = ".snippets-changed.txt"
+
+# External snippet sources (--source). A pack is a file of snippet records
+# ({"lang", "filename", "content"}): JSON Lines, one record per line, or YAML,
+# one record (or list of records) per document. A pack directory holds packs
+# as <pack>.jsonl / <pack>.yaml files, or as <pack>/<lang>.jsonl|.yaml
+# directories whose records may omit "lang". Records are streamed, and the
+# per-language files of a pack not selected with --lang are never opened.
+PACK_SUFFIXES = {".jsonl", ".yaml", ".yml"}
+# LLM results of the snippets/python templates; their code blocks become
+# PATTERN snippet files, as with extract_snippets.py
+RESULTS_SUFFIXES = {".parquet", ".pkl"}
+RESULTS_COLUMNS = ["PROMPT_ID", "RESULT", "LANG", "title", "category"]
 
 class Snippet(TypedDict):
     """A type definition for a code snippet."""
     filename: str
     content: str
 
+# (language directory, snippet) pairs, as produced by the sources
+SnippetStream = Iterator[Tuple[str, Snippet]]
+
+class ManifestEntry(TypedDict):
+    """What a generated file looked like when it was last written."""
+    sha256: str
+    size: int
+    mtime_ns: int
+
 # A collection of common code patterns for different languages.
 SNIPPETS: Dict[str, List[Snippet]] = {
     "python": [
@@ -583,6 +612,124 @@ SNIPPETS: Dict[str, List[Snippet]] = {
     ],
 }
 
+def iter_builtin(langs: Optional[Set[str]]) -> SnippetStream:
+    for lang, snippets in SNIPPETS.items():
+        if not langs or lang in langs:
+            for snippet in snippets:
+                yield lang, snippet
+
+def iter_pack_file(path: Path, default_lang: Optional[str] = None) -> SnippetStream:
+    """Stream the (lang, snippet) records of one pack file."""
+    with open(path, encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            documents = (json.loads(line) for line in f if line.strip())
+        else:
+            import yaml  # PyYAML is only needed for YAML packs
+
+            documents = yaml.safe_load_all(f)
+        for document in documents:
+            for record in document if isinstance(document, list) else [document]:
+                if not record:
+                    continue
+                lang = record.get("lang", default_lang)
+                if lang is None:
+                    print(f"  !! Skipped {record.get('filename')} in {path}: no lang")
+                    continue
+                yield lang, {"filename": record["filename"], "content": record["content"]}
+
+def iter_results(path: Path, root: Path) -> SnippetStream:
+    """Stream snippets made from the code blocks of a RESULTS.parquet/.pkl.
+
+    Files are named and deduplicated as by extract_snippets.py: one
+    gm_XX_YYY_ZZ_<title> pass over `root`, leaving out blocks already there.
+    Parquet is read one record batch at a time; a pickle is loaded whole.
+    """
+    from extract_snippets import SnippetNamer, extract_blocks, format_snippet
+
+    namer = SnippetNamer(root)
+
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        columns = [col for col in RESULTS_COLUMNS if col in parquet.schema_arrow.names]
+        batches = (batch.to_pylist() for batch in parquet.iter_batches(columns=columns))
+        rows = (row for batch in batches for row in batch)
+    else:
+        import pandas as pd
+
+        rows = (row for row in pd.read_pickle(path).to_dict("records"))
+    for row in rows:
+        title = row.get("title") or row.get("category")
+        prompt_id = row.get("PROMPT_ID")
+        extracted = extract_blocks((prompt_id, row.get("RESULT"), row.get("LANG"), title))
+        if extracted is None:
+            continue
+        blocks = namer.new_blocks(extracted["blocks"])
+        if not blocks:
+            continue
+        content = format_snippet(extracted["title"], extracted["extension"], blocks)
+        yield extracted["directory"], {"filename": namer.file_name(extracted), "content": content}
+
+def iter_sources(
+    sources: List[Path], langs: Optional[Set[str]], packs: Optional[Set[str]], root: Path
+) -> SnippetStream:
+    """Stream the snippets of every source, restricted to `langs` and `packs`.
+
+    A pack is named by its file or directory name without suffix; a results
+    file by its own stem (e.g. RESULTS).
+    """
+    for source in sources:
+        if source.is_dir():
+            for path in sorted(source.iterdir()):
+                if path.is_dir() and (not packs or path.name in packs):
+                    for lang_file in sorted(path.iterdir()):
+                        if lang_file.suffix in PACK_SUFFIXES and (
+                            not langs or lang_file.stem in langs
+                        ):
+                            yield from iter_pack_file(lang_file, default_lang=lang_file.stem)
+                elif path.suffix in PACK_SUFFIXES and (not packs or path.stem in packs):
+                    stream = iter_pack_file(path)
+                    yield from ((lang, s) for lang, s in stream if not langs or lang in langs)
+        elif packs and source.stem not in packs:
+            continue
+        elif source.suffix in PACK_SUFFIXES or source.suffix in RESULTS_SUFFIXES:
+            if source.suffix in PACK_SUFFIXES:
+                stream = iter_pack_file(source)
+            else:
+                stream = iter_results(source, root)
+            yield from ((lang, s) for lang, s in stream if not langs or lang in langs)
+        else:
+            print(f"  !! Skipped source {source}: not a pack directory, pack or results file")
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def load_manifest(path: Path) -> Dict[str, ManifestEntry]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_manifest(manifest: Dict[str, ManifestEntry], path: Path) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+def is_unchanged(file_path: Path, digest: str, entry: ManifestEntry) -> bool:
+    """True if `file_path` already holds the content hashed as `digest`.
+
+    A file whose size and mtime match its manifest entry is trusted without
+    being read; anything else (edited by hand, or missing) is re-hashed.
+    """
+    try:
+        stat = file_path.stat()
+    except FileNotFoundError:
+        return False
+    if entry and (stat.st_size, stat.st_mtime_ns) == (entry["size"], entry["mtime_ns"]):
+        return entry["sha256"] == digest
+    return text_hash(file_path.read_text(encoding="utf-8")) == digest
+
 def main():
     """Main function to generate snippet files."""
     parser = argparse.ArgumentParser(
@@ -593,23 +740,89 @@ def main():
         type=Path,
         help="The root directory to generate snippets in (e.g., 'snippets/').",
     )
+    parser.add_argument(
+        "--source",
+        type=Path,
+        action="append",
+        help=(
+            "Pack directory, pack file (.jsonl/.yaml) or RESULTS.parquet/.pkl to "
+            "generate from; repeatable (default: the built-in snippets)."
+        ),
+    )
+    parser.add_argument(
+        "--lang",
+        action="append",
+        help="Only generate snippets of this language directory (e.g. python); repeatable.",
+    )
+    parser.add_argument(
+        "--pack",
+        action="append",
+        help="Only generate snippets of this pack; repeatable.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rewrite every file, even those the manifest shows are up to date.",
+    )
+    parser.add_argument(
+        "--changed-list",
+        type=Path,
+        help=(
+            "Where to list the files written by this run "
+            f"(default: <output_dir>/{CHANGED_FILE_NAME})."
+        ),
+    )
     args = parser.parse_args()
     root_path: Path = args.output_dir
+    root_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = root_path / MANIFEST_FILE_NAME
+    manifest = load_manifest(manifest_path)
+    # Entries of files this run does not generate (other packs or languages) are kept
+    new_manifest: Dict[str, ManifestEntry] = dict(manifest)
+    changed: List[str] = []
+    generated = 0
+    langs = set(args.lang) if args.lang else None
+    packs = set(args.pack) if args.pack else None
+    if args.source:
+        snippet_stream = iter_sources(args.source, langs, packs, root_path)
+    else:
+        snippet_stream = iter_builtin(langs)
 
     print(f"Generating snippets in '{root_path.resolve()}'...")
 
-    for lang, snippets in SNIPPETS.items():
+    created_dirs: Set[str] = set()
+    for lang, snippet in snippet_stream:
         lang_dir = root_path / lang
-        lang_dir.mkdir(parents=True, exist_ok=True)
-
-        for snippet in snippets:
-            file_path = lang_dir / snippet["filename"]
-            content = textwrap.dedent(snippet["content"]).strip()
-            
+        if lang not in created_dirs:
+            lang_dir.mkdir(parents=True, exist_ok=True)
+            created_dirs.add(lang)
+
+        file_path = lang_dir / snippet["filename"]
+        relative_path = file_path.relative_to(root_path).as_posix()
+        content = textwrap.dedent(snippet["content"]).strip()
+        digest = text_hash(content)
+
+        if not args.force and is_unchanged(file_path, digest, manifest.get(relative_path)):
+            stat = file_path.stat()
+        else:
             file_path.write_text(content, encoding="utf-8")
+            stat = file_path.stat()
+            changed.append(relative_path)
             print(f"  -> Created {file_path}")
+        new_manifest[relative_path] = {
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        generated += 1
+
+    save_manifest(new_manifest, manifest_path)
+    changed_list_path = args.changed_list or root_path / CHANGED_FILE_NAME
+    changed_list_path.write_text("".join(f"{path}\n" for path in changed), encoding="utf-8")
 
     print("\nSnippet generation complete.")
+    print(f"{len(changed)} file(s) written, {generated - len(changed)} unchanged.")
+    print(f"Changed files listed in '{changed_list_path}'.")
 
 
 if __name__ == "__main__":
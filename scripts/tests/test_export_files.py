@@ -0,0 +1,32 @@
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from export_files import git_changed_files  # noqa: E402
+
+
+def git(repo, *args):
+    subprocess.run(['git', '-C', str(repo), *args], check=True, capture_output=True)
+
+
+def test_git_changed_files_from_subdirectory(tmp_path):
+    git(tmp_path, 'init', '-q')
+    git(tmp_path, 'config', 'user.email', 'test@example.com')
+    git(tmp_path, 'config', 'user.name', 'test')
+    sub = tmp_path / 'sub'
+    (sub / 'a').mkdir(parents=True)
+    (sub / 'a' / 'x.txt').write_text('one')
+    (sub / 'gone.txt').write_text('one')
+    (tmp_path / 'top.txt').write_text('one')
+    git(tmp_path, 'add', '-A')
+    git(tmp_path, 'commit', '-q', '-m', 'base')
+
+    (sub / 'a' / 'x.txt').write_text('two')
+    (sub / 'gone.txt').unlink()
+    (sub / 'new.txt').write_text('new')
+    (tmp_path / 'top.txt').write_text('two')
+
+    assert git_changed_files(sub, 'HEAD') == ['a/x.txt', 'new.txt']
+    assert git_changed_files(tmp_path, 'HEAD') == ['sub/a/x.txt', 'sub/new.txt', 'top.txt']
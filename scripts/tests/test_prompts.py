@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_batch.prompts import PromptSource  # noqa: E402
+
+PROMPTS = pd.DataFrame(
+    {
+        "PROMPT_ID": [1, 2],
+        "PROMPT": ["first prompt", "second prompt"],
+        "LANG": ["python", "go"],
+        "title": ["Lists", "Channels"],
+    }
+)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".pkl", ".csv", ".jsonl"])
+def test_prompt_column_as_additional_column(tmp_path, suffix):
+    path = tmp_path / f"prompts{suffix}"
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+        PROMPTS.to_parquet(path)
+    elif suffix == ".pkl":
+        PROMPTS.to_pickle(path)
+    elif suffix == ".csv":
+        PROMPTS.to_csv(path, index=False)
+    else:
+        PROMPTS.to_json(path, orient="records", lines=True)
+
+    source = PromptSource(path, additional_columns=["LANG", "PROMPT", "title"])
+
+    assert source.extra_columns == ["LANG", "PROMPT", "title"]
+    assert list(source) == [
+        (1, "first prompt", "python", "first prompt", "Lists"),
+        (2, "second prompt", "go", "second prompt", "Channels"),
+    ]
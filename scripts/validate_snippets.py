@@ -0,0 +1,225 @@
+# validate_snippets.py
+
+"""Check snippet files against the importer's filters without running it.
+
+Mirrors `Parser.extractPatternBlocks` and `Parser.isValidPatternBlock` from
+packages/back-nest/src/challenges/services/parser.service.ts and reads the
+same parser.config.json, so a file's accept/reject report here matches what
+`npm run reimport` will do with it. Files are checked in a process pool.
+
+Files without PATTERN markers go through tree-sitter in the importer; they
+are listed but not checked.
+"""
+
+import argparse
+import json
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TypedDict
+
+DEFAULT_CONFIG_PATH = (
+    Path(__file__).resolve().parent.parent
+    / "speedtyper-solo" / "packages" / "back-nest" / "parser.config.json"
+)
+# DEFAULT_PARSER_CONFIG.filters in parser-config.interface.ts
+DEFAULT_FILTERS: Dict[str, int] = {
+    "maxNodeLength": 800,
+    "minNodeLength": 100,
+    "maxNumLines": 25,
+    "maxLineLength": 100,
+}
+# The extensions LocalImportRunner.scanSnippetsDirectory picks up
+VALID_EXTENSIONS = {"js", "jsx", "ts", "tsx", "py", "java", "go", "rs", "c", "cpp", "cs"}
+
+PATTERN_FILE_RE = re.compile(r"^(?:\/\/|#)\s*PATTERN:", re.M)
+PATTERN_RE = re.compile(r"^(?:\/\/|#)\s*PATTERN:\s*(.+)$")
+INNER_SPACES_RE = re.compile(r"(?<=\S)\s+(?=\S)")
+
+
+class BlockReport(TypedDict):
+    """The verdict on one PATTERN block."""
+    pattern: str
+    line: int
+    chars: int
+    lines: int
+    reasons: List[str]
+
+
+def load_filters(config_path: Path) -> Dict[str, int]:
+    """The filters of parser.config.json, or the defaults wherever
+    `Parser.loadConfig` would fall back to them."""
+    try:
+        config = json.loads(config_path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        print(f"No {config_path.name} found at {config_path}, using defaults")
+        return dict(DEFAULT_FILTERS)
+    except (OSError, ValueError) as e:
+        print(f"Error loading {config_path}: {e}; using defaults")
+        return dict(DEFAULT_FILTERS)
+    filters = config.get("filters")
+    if not filters or not config.get("parsing"):
+        print("Invalid config structure, using defaults")
+        return dict(DEFAULT_FILTERS)
+    if filters["minNodeLength"] >= filters["maxNodeLength"]:
+        print("Invalid config: minNodeLength must be < maxNodeLength, using defaults")
+        return dict(DEFAULT_FILTERS)
+    if filters["maxNumLines"] <= 0 or filters["maxLineLength"] <= 0:
+        print("Invalid config: maxNumLines and maxLineLength must be > 0, using defaults")
+        return dict(DEFAULT_FILTERS)
+    return {key: filters[key] for key in DEFAULT_FILTERS}
+
+
+def js_length(text: str) -> int:
+    """`text.length` as JavaScript counts it, in UTF-16 code units."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def get_formatted_text(raw: str) -> str:
+    """Python port of `getFormattedText`, the text the importer stores."""
+    text = raw.replace("\t", "  ")
+    text = "\n".join(line.rstrip() for line in text.split("\n"))
+    text = re.sub(r"\n{2,}", "\n", text)
+    return "\n".join(INNER_SPACES_RE.sub(" ", line) for line in text.split("\n"))
+
+
+def split_pattern_blocks(content: str) -> List[Tuple[str, int, str]]:
+    """(pattern, marker line, block text) of every PATTERN block, split the
+    way `extractPatternBlocks` does it."""
+    lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    blocks = []
+    pattern: Optional[str] = None
+    block: List[str] = []
+    start_line = 0
+    for i, line in enumerate(lines):
+        match = PATTERN_RE.match(line)
+        if match:
+            if pattern and block:
+                blocks.append((pattern, start_line, "\n".join(block).strip()))
+            pattern = match.group(1).strip()
+            block = []
+            start_line = i + 1
+        elif pattern and (block or line.strip() != ""):
+            block.append(line)
+    if pattern and block:
+        blocks.append((pattern, start_line, "\n".join(block).strip()))
+    return blocks
+
+
+def check_block(text: str, filters: Dict[str, int]) -> List[str]:
+    """The reasons `isValidPatternBlock` would reject `text`; empty if valid."""
+    lines = text.split("\n")
+    chars = js_length(text)
+    reasons = []
+    if chars < filters["minNodeLength"]:
+        reasons.append(f"Below min length (need {filters['minNodeLength']}, got {chars})")
+    if chars > filters["maxNodeLength"]:
+        reasons.append(f"Above max length (max {filters['maxNodeLength']}, got {chars})")
+    if not 2 <= len(lines) <= filters["maxNumLines"]:
+        reasons.append(
+            f"Line count outside range (need 2-{filters['maxNumLines']}, got {len(lines)})"
+        )
+    long_lines = [line for line in lines if js_length(line) > filters["maxLineLength"]]
+    if long_lines:
+        reasons.append(
+            f"{len(long_lines)} line(s) too long (max {filters['maxLineLength']} chars)"
+        )
+    return reasons
+
+
+def validate_file(job: Tuple[Path, Dict[str, int]]) -> Optional[List[BlockReport]]:
+    """Block reports of one file, or None if it has no PATTERN markers."""
+    path, filters = job
+    content = path.read_text(encoding="utf-8", errors="replace")
+    if not PATTERN_FILE_RE.search(content.replace("\r\n", "\n").replace("\r", "\n")):
+        return None
+    return [
+        {
+            "pattern": pattern,
+            "line": line,
+            "chars": js_length(text),
+            "lines": len(text.split("\n")),
+            "reasons": check_block(text, filters),
+        }
+        for pattern, line, text in split_pattern_blocks(content)
+    ]
+
+
+def scan_snippets(root: Path) -> List[Path]:
+    """Files the importer would read, in a stable order."""
+    return sorted(
+        path
+        for path in root.rglob("*")
+        if path.is_file() and path.suffix.lstrip(".") in VALID_EXTENSIONS
+    )
+
+
+def main():
+    """Main function to validate a snippets tree."""
+    parser = argparse.ArgumentParser(
+        description="Report which PATTERN blocks the snippet importer will accept."
+    )
+    parser.add_argument(
+        "snippets_dir",
+        type=Path,
+        help="The snippets root to check (e.g., 'speedtyper-solo/snippets/').",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        default=DEFAULT_CONFIG_PATH,
+        help="parser.config.json to apply (default: the back-nest one).",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Explain every rejected block."
+    )
+    parser.add_argument(
+        "--strict", action="store_true", help="Exit with status 1 if any block is rejected."
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Checker processes (default: one per CPU)."
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    filters = load_filters(args.config)
+    print(
+        f"Filters: {filters['minNodeLength']}-{filters['maxNodeLength']} chars, "
+        f"max {filters['maxNumLines']} lines, max {filters['maxLineLength']} chars/line\n"
+    )
+    files = scan_snippets(args.snippets_dir)
+
+    accepted = rejected = unchecked = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        jobs = ((path, filters) for path in files)
+        for path, reports in zip(files, pool.map(validate_file, jobs, chunksize=64)):
+            relative_path = path.relative_to(args.snippets_dir)
+            if reports is None:
+                unchecked += 1
+                print(f"  ⊘ {relative_path} - No PATTERN markers (tree-sitter mode, not checked)")
+                continue
+            valid = sum(1 for report in reports if not report["reasons"])
+            accepted += valid
+            rejected += len(reports) - valid
+            mark = "✓" if valid == len(reports) else "✗"
+            print(f"  {mark} {relative_path} - {valid}/{len(reports)} block(s) accepted")
+            if args.verbose:
+                for report in reports:
+                    for reason in report["reasons"]:
+                        print(
+                            f"      line {report['line']} ({report['pattern']}, "
+                            f"{report['chars']} chars, {report['lines']} lines): {reason}"
+                        )
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"\nChecked {len(files)} file(s) in {elapsed_ms:.0f} ms")
+    print(f"✅ Accepted: {accepted} block(s)")
+    print(f"❌ Rejected: {rejected} block(s)")
+    if unchecked:
+        print(f"⊘  Not checked: {unchecked} file(s) without PATTERN markers")
+    return 1 if args.strict and rejected else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+# The shared batch runner lives in scripts/llm_batch, outside the snippets corpus
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "scripts"))
+
+from llm_batch.providers.anthropic_provider import AnthropicProvider
+from llm_batch.providers.gemini_provider import GeminiProvider
+from llm_batch.providers.openai_provider import DeepSeekProvider, OpenAIProvider
+from llm_batch.router import Route, RouterProvider
+from llm_batch.runner import RunConfig, main
+
+# User-defined constants
+SYSTEM_PROMPT = 'You are a helpful assistant and a web development expert.'
+MAX_TOKENS = 4096
+TEMPERATURE = 0.5
+PROMPT_INDEX_COLUMN = 'PROMPT_ID'  # Name of the column containing prompt indices
+PROMPT_COLUMN = 'PROMPT'  # Name of the column containing the actual prompts
+MAX_CONCURRENCY = 16  # Maximum number of API requests in flight at once, across all routes
+
+# Providers to spread the prompts over. Each gets a share of the prompts by
+# weight and keeps its own request/token budget; a failing provider's prompts
+# fail over to the others. Remove a route to stop using that provider.
+ROUTES = [
+    Route(
+        AnthropicProvider("claude-3-sonnet-20240229", MAX_TOKENS, TEMPERATURE, system_prompt=SYSTEM_PROMPT),
+        weight=1,
+        requests_per_minute=50,
+        tokens_per_minute=40_000,
+    ),
+    Route(
+        OpenAIProvider("gpt-4o-2024-08-06", MAX_TOKENS, TEMPERATURE, system_prompt=SYSTEM_PROMPT),
+        weight=2,
+        requests_per_minute=500,
+        tokens_per_minute=30_000,
+    ),
+    Route(
+        DeepSeekProvider("deepseek-chat", MAX_TOKENS, TEMPERATURE, system_prompt=SYSTEM_PROMPT),
+        weight=1,
+        requests_per_minute=60,
+    ),
+    Route(
+        GeminiProvider("gemini-2.5-pro", MAX_TOKENS, TEMPERATURE, system_prompt=SYSTEM_PROMPT),
+        weight=1,
+        requests_per_minute=5,
+        tokens_per_minute=250_000,
+    ),
+]
+
+# Additional columns to include in results
+ADDITIONAL_COLUMNS = ['TUTORIAL_PATH']
+
+
+if __name__ == '__main__':
+    router = RouterProvider(ROUTES)
+    main(
+        router,
+        RunConfig(
+            prompt_index_column=PROMPT_INDEX_COLUMN,
+            prompt_column=PROMPT_COLUMN,
+            additional_columns=ADDITIONAL_COLUMNS,
+            # Each route paces itself; the runner only caps the combined rate
+            requests_per_minute=router.requests_per_minute,
+            max_concurrency=MAX_CONCURRENCY,
+        ),
+    )